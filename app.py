@@ -1,10 +1,14 @@
 import dash
 import dash_bootstrap_components as dbc
 import dash_auth
+import logging
 import os
 from dash import html
 from dash import dcc
 
+# the dashboard logs at INFO, e.g. the tracing summary after every game it loads
+logging.basicConfig(level=logging.INFO)
+
 app = dash.Dash(
     __name__, 
     external_stylesheets=[dbc.themes.BOOTSTRAP],
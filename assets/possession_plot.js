@@ -0,0 +1,204 @@
+/*
+ * Draws a possession on the field in the browser, from the columns
+ * audldb.game.possession_columns puts in the home page's game store.
+ *
+ * Mirrors audldb.game.possession_traces, so the figure is the same one the
+ * server would send, see AUDLDB_CLIENTSIDE_PLOT in the README.
+ */
+
+(function () {
+    function flag(game, row, name) {
+        return (game.flags[row] & game.flag_bits[name]) !== 0;
+    }
+
+    // Python's str() of a bool, for the hover text
+    function pyBool(value) {
+        return value ? "True" : "False";
+    }
+
+    function determineColor(game, row, receiver) {
+        if (flag(game, row, "throwaway")) {
+            return "red";
+        } else if (flag(game, row, "stall")) {
+            return "blue";
+        } else if (flag(game, row, "drop") && receiver) {
+            return "orange";
+        } else if (flag(game, row, "goal") && receiver) {
+            return "green";
+        } else if (flag(game, row, "goal")) {
+            return "magenta";
+        }
+        return "black";
+    }
+
+    function determineName(game, row, receiver) {
+        if (flag(game, row, "throwaway")) {
+            return "Throwaway";
+        }
+        if (flag(game, row, "stall")) {
+            return "Stall";
+        } else if (flag(game, row, "drop") && receiver) {
+            return "Drop";
+        } else if (flag(game, row, "goal") && receiver) {
+            return "Goal";
+        } else if (flag(game, row, "goal")) {
+            return "Assist";
+        }
+        return "Completion";
+    }
+
+    function markerTrace(x, y, text, hovertext, color, name) {
+        return {
+            hovertext: hovertext,
+            marker: {color: color, size: 10},
+            mode: "markers+text",
+            name: name,
+            text: text,
+            textposition: "top center",
+            x: x,
+            y: y,
+            type: "scatter"
+        };
+    }
+
+    function lineTrace(x, y, color) {
+        return {
+            line: {color: color, width: 1},
+            mode: "lines",
+            showlegend: false,
+            x: x,
+            y: y,
+            type: "scatter"
+        };
+    }
+
+    function possessionTraces(game, i) {
+        var rows = [];
+        for (var row = game.starts[i]; row < game.stops[i]; row++) {
+            rows.push(row);
+        }
+
+        var completions = rows.filter(function (r) {
+            return !flag(game, r, "throwaway") && !flag(game, r, "goal");
+        });
+        var goals = rows.filter(function (r) {
+            return !flag(game, r, "turnover") && flag(game, r, "goal");
+        });
+        var throwaways = rows.filter(function (r) {
+            return flag(game, r, "throwaway") && !flag(game, r, "drop");
+        });
+        var drops = rows.filter(function (r) {
+            return flag(game, r, "drop");
+        });
+        var stalls = rows.filter(function (r) {
+            return flag(game, r, "stall");
+        });
+
+        function thrower(r) {
+            return game.players[game.thrower[r]];
+        }
+
+        function receiver(r) {
+            return game.players[game.receiver[r]];
+        }
+
+        var traces = [completions, throwaways, goals].map(function (plays) {
+            return markerTrace(
+                plays.map(function (r) { return game.throw_x[r]; }),
+                plays.map(function (r) { return game.throw_y[r]; }),
+                plays.map(thrower),
+                plays.map(function (r) {
+                    return "id: " + thrower(r) + ", goal: " + pyBool(flag(game, r, "goal")) +
+                        "\n turnover: " + pyBool(flag(game, r, "turnover")) +
+                        ", drop: " + pyBool(flag(game, r, "drop"));
+                }),
+                plays.map(function (r) { return determineColor(game, r, false); }),
+                plays.length > 0 ? determineName(game, plays[0], false) : ""
+            );
+        });
+
+        // all of the lines
+        traces.push(lineTrace(
+            rows.map(function (r) { return game.throw_x[r]; }),
+            rows.map(function (r) { return game.throw_y[r]; }),
+            "Black"
+        ));
+
+        function hasReceivePosition(r) {
+            return game.receive_x[r] !== null && game.receive_y[r] !== null;
+        }
+
+        function wasReceived(r) {
+            return game.receiver[r] >= 0 && hasReceivePosition(r);
+        }
+
+        function receiveMarker(r) {
+            return markerTrace(
+                [game.receive_x[r]],
+                [game.receive_y[r]],
+                [receiver(r)],
+                receiver(r),
+                determineColor(game, r, true),
+                determineName(game, r, true)
+            );
+        }
+
+        function throwLine(r, color) {
+            return lineTrace(
+                [game.throw_x[r], game.receive_x[r]],
+                [game.throw_y[r], game.receive_y[r]],
+                color
+            );
+        }
+
+        // how the possession ended
+        if (goals.length > 0) {
+            traces.push(receiveMarker(goals[0]), throwLine(goals[0], "green"));
+        } else if (drops.length > 0 || stalls.length > 0) {
+            var turnover = drops.length > 0 ? drops[0] : stalls[0];
+            // nobody receives a stall, so it has no marker, and its line can be missing too
+            if (wasReceived(turnover)) {
+                traces.push(receiveMarker(turnover));
+            }
+            var last = completions[completions.length - 1];
+            if (completions.length > 0 && hasReceivePosition(last)) {
+                traces.push(throwLine(last, "orange"));
+            }
+        } else if (throwaways.length > 0) {
+            if (hasReceivePosition(throwaways[0])) {
+                traces.push(throwLine(throwaways[0], "red"));
+            }
+        }
+
+        return traces;
+    }
+
+    function possessionAnnotation(game, i) {
+        return {
+            align: "left",
+            bordercolor: "black",
+            borderwidth: 1,
+            text: game.annotations[i],
+            x: 0.2,
+            xref: "paper",
+            y: 0.5,
+            yref: "paper"
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        audldb: {
+            // the slider's value is 1 based, -1 before a game is picked
+            possessionFigure: function (value, game, figure) {
+                var layout = Object.assign({}, figure.layout);
+                if (!game || value < 1 || value > game.starts.length) {
+                    delete layout.annotations;
+                    return {data: [], layout: layout};
+                }
+
+                layout.annotations = [possessionAnnotation(game, value - 1)];
+                return {data: possessionTraces(game, value - 1), layout: layout};
+            }
+        }
+    });
+})();
@@ -0,0 +1,65 @@
+"""
+Server time of one slider tick: the field, a possession on it and the JSON sent to the browser.
+
+Compares drawing the field from scratch every time with the cached copy
+game.plot_field hands out, and both with game.possession_figure, which builds
+the figure as a dict without graph objects.
+
+    python benchmarks/bench_field.py
+"""
+
+import argparse
+import json
+import time
+
+import plotly.graph_objects as go
+import plotly.io.json
+
+from audldb import game, munging, synthetic
+
+
+def time_per_call(run, repeat, number):
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            run()
+        best = min(best, time.perf_counter() - start_time)
+    return best / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20, help="calls per repeat")
+    args = parser.parse_args(argv)
+
+    _, _, possessions = munging.parse_events(synthetic.generate_game(0, 40))
+    possession = max(possessions, key=lambda x: len(x.play_by_play))
+
+    fresh_field = lambda: game.draw_field(go.Figure())
+    cached_field = lambda: game.plot_field()
+
+    # the callback's figure goes out the way dash serializes it
+    def tick(field):
+        fig = game.plot_possession(field(), possession)
+        return plotly.io.json.to_json_plotly(fig)
+
+    def dict_tick():
+        return plotly.io.json.to_json_plotly(game.possession_figure(possession))
+
+    # all of them have to give the same figure, the template's keys just come out in another order
+    assert json.loads(tick(fresh_field)) == json.loads(tick(cached_field)) == json.loads(dict_tick())
+
+    for name, run in [
+        ("field, drawn", fresh_field),
+        ("field, cached", cached_field),
+        ("tick, drawn", lambda: tick(fresh_field)),
+        ("tick, cached", lambda: tick(cached_field)),
+        ("tick, dict", dict_tick),
+    ]:
+        print(f"{name:<16} {time_per_call(run, args.repeat, args.number) * 1e3:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Peak and retained memory of parsing games with munging.parse_events.
+
+Parses every game while tracemalloc is tracing and keeps the results, the way a
+worker holding a season would, then breaks what's retained down by object type.
+Exits with 1 when the per game averages go over the budget.
+
+    python benchmarks/bench_memory.py --games 50
+    python benchmarks/bench_memory.py --archive games.jsonl.gz --max-retained-kb 768
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from collections import Counter
+
+from audldb import ingest, munging, synthetic
+
+# per game, about 1.5 times what a synthetic 40 point game takes (~350KB), so
+# a change that doubles the footprint goes over
+DEFAULT_MAX_PEAK_KB = 512
+DEFAULT_MAX_RETAINED_KB = 512
+
+
+def _children(obj):
+    if isinstance(obj, dict):
+        yield from obj.keys()
+        yield from obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        yield from obj
+    elif hasattr(obj, "__slots__"):
+        for name in obj.__slots__:
+            yield getattr(obj, name, None)
+    elif hasattr(obj, "__dict__"):
+        yield obj.__dict__
+
+
+def retained_by_type(roots):
+    """Shallow size and count of every object reachable from ``roots``, by type name
+
+    Dicts are split into the raw events kept by the points and every other dict.
+    """
+    sizes = Counter()
+    counts = Counter()
+    seen = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, (bool, type)):
+            continue
+        seen.add(id(obj))
+
+        name = type(obj).__name__
+        if isinstance(obj, dict) and "t" in obj:
+            name = "event dict"
+        sizes[name] += sys.getsizeof(obj)
+        counts[name] += 1
+        stack.extend(_children(obj))
+
+    return sizes, counts
+
+
+def measure(game_infos, registry=None):
+    """Peak and retained bytes of each game, and everything parsed"""
+    gc.collect()
+    tracemalloc.start()
+    parsed = []
+    peaks, retained = [], []
+    for game_info in game_infos:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        parsed.append(munging.parse_events(game_info, registry=registry))
+
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained.append(current - before)
+
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return peaks, retained, parsed, snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive", help="archive written by audldb.ingest, synthetic games otherwise")
+    parser.add_argument("--games", type=int, default=30, help="synthetic games")
+    parser.add_argument("--points", type=int, default=40, help="points per synthetic game")
+    parser.add_argument("--max-peak-kb", type=float, default=DEFAULT_MAX_PEAK_KB, help="budget per game")
+    parser.add_argument("--max-retained-kb", type=float, default=DEFAULT_MAX_RETAINED_KB, help="budget per game")
+    parser.add_argument("--top", type=int, default=10, help="allocation sites to show")
+    parser.add_argument("--registry", action="store_true", help="share players through a PlayerRegistry")
+    args = parser.parse_args(argv)
+
+    if args.archive:
+        game_infos = [x for _, x in ingest.iter_archive(args.archive)]
+    else:
+        game_infos = [x for _, x in synthetic.generate_season(args.games, num_points=args.points)]
+
+    registry = munging.PlayerRegistry() if args.registry else None
+    peaks, retained, parsed, snapshot = measure(game_infos, registry)
+    num_games = len(game_infos)
+    mean_peak = sum(peaks) / num_games / 1024
+    mean_retained = sum(retained) / num_games / 1024
+
+    print(f"{num_games} games")
+    print(f"peak per game:     mean {mean_peak:8.1f}KB, max {max(peaks) / 1024:8.1f}KB")
+    print(f"retained per game: mean {mean_retained:8.1f}KB, max {max(retained) / 1024:8.1f}KB")
+
+    sizes, counts = retained_by_type(parsed)
+    print("\nretained by type, per game")
+    for name, size in sizes.most_common():
+        print(f"  {name:<16} {counts[name] / num_games:10.1f} objects {size / num_games / 1024:10.1f}KB")
+
+    print("\ntop allocation sites still held")
+    for stat in snapshot.statistics("lineno")[: args.top]:
+        print(f"  {stat.size / num_games / 1024:8.1f}KB/game  {stat.traceback}")
+
+    over_budget = []
+    if mean_peak > args.max_peak_kb:
+        over_budget.append(f"peak {mean_peak:.1f}KB > {args.max_peak_kb:.1f}KB")
+    if mean_retained > args.max_retained_kb:
+        over_budget.append(f"retained {mean_retained:.1f}KB > {args.max_retained_kb:.1f}KB")
+
+    for message in over_budget:
+        print(f"over budget: {message} per game")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
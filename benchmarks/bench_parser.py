@@ -0,0 +1,174 @@
+"""
+Time the parser and the possession plot on synthetic games of different sizes.
+
+Every run appends one JSON line per benchmark to the results file, and is
+compared against the last recorded run of the same benchmark, so regressions
+show up over time.
+
+    python benchmarks/bench_parser.py
+    python benchmarks/bench_parser.py --points 40 --games 50 --no-plot
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import plotly.graph_objects as go
+
+from audldb import game, munging, synthetic
+
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_of(repeat, run):
+    """Best and median wall time of ``run()`` over ``repeat`` runs"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return min(times), statistics.median(times)
+
+
+def num_events(game_infos):
+    return sum(
+        len(json.loads(x["tsgHome"]["events"])) + len(json.loads(x["tsgAway"]["events"]))
+        for x in game_infos
+    )
+
+
+def bench_games(game_infos, repeat, plot_possessions):
+    """Every stage over all of ``game_infos``, yields ``(benchmark, seconds, median, units)``"""
+    parsed = [munging.parse_events(x) for x in game_infos]
+    events = num_events(game_infos)
+
+    def parse():
+        for x in game_infos:
+            munging.parse_events(x)
+
+    def play_by_play():
+        for roster_id_map, points, _ in parsed:
+            munging.create_play_by_play(points, roster_id_map)
+
+    def possessions():
+        for _, points, _ in parsed:
+            munging.create_possessions(points)
+
+    yield ("parse_events", *best_of(repeat, parse), events)
+    yield ("create_play_by_play", *best_of(repeat, play_by_play), events)
+    yield ("create_possessions", *best_of(repeat, possessions), events)
+
+    if plot_possessions > 0:
+        # the page draws onto a fresh field every time, only the possession is timed
+        field = game.plot_field()
+        to_plot = [x for _, _, game_possessions in parsed for x in game_possessions][:plot_possessions]
+        figures = [[go.Figure(field) for _ in to_plot] for _ in range(repeat)]
+
+        def plot():
+            for possession, fig in zip(to_plot, figures.pop()):
+                game.plot_possession(fig, possession)
+
+        yield ("plot_possession", *best_of(repeat, plot), len(to_plot))
+
+
+def load_previous(path):
+    previous = {}
+    if not os.path.exists(path):
+        return previous
+
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            previous[(record["benchmark"], record["points"], record["games"])] = record
+    return previous
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[20, 40, 80], help="points per game")
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 10, 50], help="games per season")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plot-possessions", type=int, default=50, help="possessions to plot per case")
+    parser.add_argument("--no-plot", action="store_const", const=0, dest="plot_possessions")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON lines file to append to")
+    parser.add_argument("--no-record", action="store_true", help="compare without appending")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="exit with 1 when a benchmark is this many times slower than last time",
+    )
+    args = parser.parse_args(argv)
+
+    previous = load_previous(args.results)
+    run = {
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+
+    records = []
+    regressions = 0
+    print(f"{'benchmark':<20} {'points':>6} {'games':>6} {'best':>10} {'per unit':>12} {'vs last':>8}")
+    for points in args.points:
+        for games in args.games:
+            game_infos = [x for _, x in synthetic.generate_season(games, args.seed, points)]
+            # only plot from the single game cases, the number of games doesn't change it
+            plot_possessions = args.plot_possessions if games == min(args.games) else 0
+
+            for benchmark, best, median, units in bench_games(game_infos, args.repeat, plot_possessions):
+                record = dict(
+                    run,
+                    benchmark=benchmark,
+                    points=points,
+                    games=games,
+                    seconds=best,
+                    median=median,
+                    units=units,
+                    ns_per_unit=best / units * 1e9,
+                )
+                records.append(record)
+
+                last = previous.get((benchmark, points, games))
+                # per unit, so changing how much gets plotted doesn't look like a regression
+                ratio = record["ns_per_unit"] / last["ns_per_unit"] if last is not None else None
+                if ratio is not None and ratio > args.threshold:
+                    regressions += 1
+
+                print(
+                    f"{benchmark:<20} {points:>6} {games:>6} {best * 1e3:>8.2f}ms "
+                    f"{record['ns_per_unit']:>10.0f}ns "
+                    + (f"{ratio:>7.2f}x" if ratio is not None else f"{'-':>8}")
+                    + (" slower" if ratio is not None and ratio > args.threshold else "")
+                )
+
+    if not args.no_record:
+        with open(args.results, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+"""
+Bytes sent to the browser per slider tick, whole figures against dash.Patch updates.
+
+Goes through every possession of a game the way update_possession_plot would
+and serializes the response the way dash does, reporting raw and gzipped
+(dash's compress=True) sizes and the server time per tick.
+
+    python benchmarks/bench_payload.py
+    python benchmarks/bench_payload.py --archive games.jsonl.gz
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+import plotly.io.json
+
+from audldb import game, ingest, munging, synthetic
+
+
+def apply_patch(figure, patch):
+    """What the browser does with a patch of plain ``Assign`` operations"""
+    for operation in patch.to_plotly_json()["operations"]:
+        assert operation["operation"] == "Assign", operation
+        target = figure
+        *path, last = operation["location"]
+        for key in path:
+            target = target[key]
+        target[last] = operation["params"]["value"]
+    return figure
+
+
+def measure(possessions, respond):
+    sizes, compressed, times = [], [], []
+    for possession in possessions:
+        start_time = time.perf_counter()
+        body = plotly.io.json.to_json_plotly(respond(possession)).encode("utf-8")
+        times.append(time.perf_counter() - start_time)
+        sizes.append(len(body))
+        compressed.append(len(gzip.compress(body)))
+    return sizes, compressed, times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive", help="archive written by audldb.ingest, a synthetic game otherwise")
+    parser.add_argument("--points", type=int, default=40, help="points of the synthetic game")
+    args = parser.parse_args(argv)
+
+    if args.archive:
+        _, game_info = next(ingest.iter_archive(args.archive))
+    else:
+        game_info = synthetic.generate_game(0, args.points)
+    _, _, possessions = munging.parse_events(game_info)
+    possessions = list(possessions)
+
+    # patching the bare field has to give the whole figure
+    for possession in possessions[:10]:
+        field = json.loads(plotly.io.json.to_json_plotly(game.plot_field()))
+        assert apply_patch(field, game.possession_patch(possession)) == game.possession_figure(possession)
+
+    print(f"{len(possessions)} possessions, per tick")
+    for name, respond in [
+        ("figure", game.possession_figure),
+        ("patch", game.possession_patch),
+    ]:
+        sizes, compressed, times = measure(possessions, respond)
+        print(
+            f"{name:<8} mean {statistics.mean(sizes) / 1024:6.1f}KB (gzip {statistics.mean(compressed) / 1024:5.1f}KB),"
+            f" max {max(sizes) / 1024:6.1f}KB, server {statistics.mean(times) * 1e3:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
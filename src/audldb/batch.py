@@ -0,0 +1,225 @@
+"""
+Parse many games at once across a process pool.
+
+Every game is parsed on its own, so a game that can't be parsed is recorded as
+a ``ParseFailure`` and the rest of the batch carries on. That includes a game
+that takes its worker process down with it.
+
+    python -m audldb.batch games.jsonl.gz --quarantine failures.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+import traceback
+
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import ingest, munging
+from .compact import compact_parsed_event
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParseFailure:
+    game_id: str
+    error_type: str
+    message: str
+    point_index: Optional[int]
+    traceback: str
+
+
+@dataclass
+class BatchResult:
+    parsed: Dict[str, munging.ParsedEvent] = field(default_factory=dict)
+    failures: List[ParseFailure] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+ParseOutcome = Tuple[str, Union[munging.ParsedEvent, None], Union[ParseFailure, None]]
+
+
+def parse_game(game_id, game_info, compact=False) -> ParseOutcome:
+    try:
+        parsed = munging.ParsedEvent(*munging.parse_events(game_info, use_columnar=True))
+    except Exception as e:
+        failure = ParseFailure(
+            game_id,
+            type(e).__name__,
+            str(e),
+            getattr(e, "point_index", None),
+            traceback.format_exc(),
+        )
+        return game_id, None, failure
+
+    # the compact form is much cheaper to send back to the parent process
+    return game_id, compact_parsed_event(parsed) if compact else parsed, None
+
+
+def _parse_archived_game(archive_path, game_id, compact) -> ParseOutcome:
+    try:
+        game_info = ingest.read_game(archive_path, game_id)
+    except Exception as e:
+        return game_id, None, ParseFailure(
+            game_id, type(e).__name__, str(e), None, traceback.format_exc()
+        )
+
+    return parse_game(game_id, game_info, compact)
+
+
+def _worker_died(game_id, e) -> ParseOutcome:
+    return game_id, None, ParseFailure(game_id, type(e).__name__, str(e), None, "")
+
+
+def _harvest(done, pending, suspects) -> Iterator[ParseOutcome]:
+    """Outcomes of the ``done`` futures, the jobs of those whose worker died go to ``suspects``"""
+    for future in done:
+        job = pending.pop(future)
+        if isinstance(future.exception(), BrokenProcessPool):
+            suspects.append(job)
+        else:
+            yield future.result()
+
+
+def _iter_completed(submit, jobs, game_id_of, max_workers, max_pending) -> Iterator[ParseOutcome]:
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or max_workers * 4
+
+    jobs = iter(jobs)
+    # the jobs in flight when a worker died, any one of them may have killed it
+    suspects = []
+    while True:
+        with futures.ProcessPoolExecutor(max_workers) as ex:
+            # one at a time in a fresh pool, so a crash is put down to the game that caused it
+            broken = False
+            while suspects and not broken:
+                job = suspects.pop(0)
+                try:
+                    outcome = submit(ex, job).result()
+                except BrokenProcessPool as e:
+                    outcome = _worker_died(game_id_of(job), e)
+                    broken = True
+                yield outcome
+            if broken:
+                continue
+
+            pending = {}
+            exhausted = False
+            for job in jobs:
+                # keep a bounded number of games in flight so memory stays flat
+                if len(pending) >= max_pending:
+                    done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    yield from _harvest(done, pending, suspects)
+
+                if not suspects:
+                    try:
+                        pending[submit(ex, job)] = job
+                        continue
+                    except BrokenProcessPool:
+                        pass
+
+                # the pool is broken, this job goes to the next one
+                jobs = itertools.chain([job], jobs)
+                break
+            else:
+                exhausted = True
+
+            yield from _harvest(futures.as_completed(pending), pending, suspects)
+
+        if exhausted and not suspects:
+            return
+
+
+def iter_parse_batch(
+    games: Iterable[Tuple[str, Dict]],
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    compact: bool = False,
+) -> Iterator[ParseOutcome]:
+    """Parse ``(game_id, game_info)`` pairs, yielding ``(game_id, parsed, failure)`` as they finish"""
+    return _iter_completed(
+        lambda ex, game: ex.submit(parse_game, game[0], game[1], compact),
+        games,
+        lambda game: game[0],
+        max_workers,
+        max_pending,
+    )
+
+
+def iter_parse_archive(
+    archive_path,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    compact: bool = False,
+) -> Iterator[ParseOutcome]:
+    """Like ``iter_parse_batch`` for an ingest archive, each worker reads its own games"""
+    game_ids = list(ingest.ArchiveIndex.load(archive_path).games)
+    return _iter_completed(
+        lambda ex, game_id: ex.submit(_parse_archived_game, archive_path, game_id, compact),
+        game_ids,
+        lambda game_id: game_id,
+        max_workers,
+        max_pending,
+    )
+
+
+def collect(outcomes: Iterable[ParseOutcome], keep_parsed=True) -> BatchResult:
+    result = BatchResult()
+    start_time = time.perf_counter()
+    for game_id, parsed, failure in outcomes:
+        if failure is not None:
+            logger.warning("Quarantined %s: %s: %s", game_id, failure.error_type, failure.message)
+            result.failures.append(failure)
+        elif keep_parsed:
+            result.parsed[game_id] = parsed
+
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+
+def parse_batch(games: Iterable[Tuple[str, Dict]], **kwargs) -> BatchResult:
+    return collect(iter_parse_batch(games, **kwargs))
+
+
+def write_failures(failures: Iterable[ParseFailure], path):
+    with open(path, "w") as f:
+        for failure in failures:
+            f.write(json.dumps(asdict(failure)) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse every game of an ingest archive")
+    parser.add_argument("archive", help="archive written by audldb.ingest")
+    parser.add_argument("--workers", type=int, default=None, help="processes, defaults to the cpu count")
+    parser.add_argument("--quarantine", help="write a JSON line per game that failed to parse here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    result = collect(
+        iter_parse_archive(args.archive, max_workers=args.workers, compact=True),
+        keep_parsed=False,
+    )
+    num_games = len(ingest.ArchiveIndex.load(args.archive).games)
+    logger.info(
+        "Parsed %d games in %.2fs, %d failed",
+        num_games - len(result.failures),
+        result.elapsed,
+        len(result.failures),
+    )
+
+    if args.quarantine:
+        write_failures(result.failures, args.quarantine)
+
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
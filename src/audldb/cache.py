@@ -0,0 +1,296 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+import requests
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+from . import common
+from .crawler import get_session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    game_id: str
+    digest: str
+    content: bytes
+
+
+def game_is_final(game_info) -> bool:
+    game = game_info.get("game") or {}
+    return str(game.get("status", "")).lower() == "final"
+
+
+class GameCache(object):
+    """Content-addressed disk cache of raw game payloads, keyed by game id.
+
+    Blobs are stored by the sha256 of their content; ``index.json`` maps each
+    game id to its current blob along with the validators needed to revalidate
+    games that are not final yet. Least recently used blobs (by mtime, which a
+    hit touches) are evicted once the blob directory exceeds ``max_bytes``.
+
+    Several processes can share the directory: every change to the index is
+    made under ``index.lock``, and reads don't need it since the index is
+    only ever replaced whole.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        revalidate_after: float = 30.0,
+        timeout: float = 30.0,
+        session: Optional[requests.Session] = None,
+    ):
+        self.directory = directory or os.path.join(common.cache_dir(), "games")
+        self.max_bytes = common.cache_max_bytes() if max_bytes is None else max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.session = session or get_session()
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @contextmanager
+    def _locked(self):
+        """Held while the index is loaded, changed and saved"""
+        with self._lock, common.file_lock(os.path.join(self.directory, "index.lock")):
+            yield
+
+    def blob_path(self, digest):
+        return os.path.join(self.directory, "blobs", digest[:2], digest + ".json")
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning("Discarding corrupt game cache index at %s", self.index_path)
+            return {}
+
+    def _save_index(self, index):
+        common.atomic_write(self.index_path, json.dumps(index).encode("utf-8"))
+
+    def _read_blob(self, digest) -> Union[bytes, None]:
+        try:
+            with open(self.blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, index, game_id, content, response):
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self.blob_path(digest)
+        if not os.path.exists(blob_path):
+            common.atomic_write(blob_path, content)
+        else:
+            self._touch(digest)
+
+        index[game_id] = {
+            "digest": digest,
+            "size": len(content),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "final": game_is_final(json.loads(content)),
+            "validated": time.time(),
+        }
+        self._evict(index)
+        return CacheEntry(game_id, digest, content)
+
+    def _touch(self, digest) -> bool:
+        try:
+            os.utime(self.blob_path(digest))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _evict(self, index):
+        """Remove the least recently used blobs and their games until the blobs fit in ``max_bytes``
+
+        Goes by what's on disk rather than the index, so a blob that lost its
+        index entry (say to a process killed part way through) is reclaimed too.
+        """
+        blobs = []
+        for root, _, names in os.walk(os.path.join(self.directory, "blobs")):
+            for name in names:
+                if name.endswith(".json"):
+                    stat = os.stat(os.path.join(root, name))
+                    blobs.append((stat.st_mtime, stat.st_size, name[: -len(".json")]))
+
+        total = sum(x[1] for x in blobs)
+        if total <= self.max_bytes:
+            return
+
+        game_ids = {}
+        for game_id, entry in index.items():
+            game_ids.setdefault(entry["digest"], []).append(game_id)
+
+        # the newest blob stays even if it's bigger than everything allowed
+        for _, size, digest in sorted(blobs)[:-1]:
+            if total <= self.max_bytes:
+                break
+
+            for game_id in game_ids.get(digest, []):
+                del index[game_id]
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _remove_unreferenced_blob(self, index, digest) -> bool:
+        if any(entry["digest"] == digest for entry in index.values()):
+            return False
+
+        try:
+            os.remove(self.blob_path(digest))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _needs_revalidation(self, entry):
+        if entry["final"]:
+            return False
+
+        return time.time() - entry["validated"] > self.revalidate_after
+
+    def fetch(self, url) -> CacheEntry:
+        game_id = common.game_id_from_url(url)
+
+        # a hit only reads the index, and marks the blob as used through its mtime
+        index = self._load_index()
+        entry = index.get(game_id)
+        content = self._read_blob(entry["digest"]) if entry is not None else None
+
+        if content is not None and not self._needs_revalidation(entry):
+            self._touch(entry["digest"])
+            return CacheEntry(game_id, entry["digest"], content)
+
+        # the lock isn't held over the network round trip, other games can
+        # still be served from disk in the meantime
+        headers = {}
+        if content is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            if content is None:
+                raise
+            logger.warning("Revalidation failed for %s, serving cached copy", game_id)
+            return CacheEntry(game_id, entry["digest"], content)
+
+        with self._locked():
+            index = self._load_index()
+            if response.status_code == 304 and content is not None:
+                index[game_id] = entry
+                entry["validated"] = time.time()
+                self._save_index(index)
+                self._touch(entry["digest"])
+                return CacheEntry(game_id, entry["digest"], content)
+
+            cache_entry = self._store(index, game_id, response.content, response)
+            self._save_index(index)
+            return cache_entry
+
+    def get(self, url) -> bytes:
+        return self.fetch(url).content
+
+    def invalidate(self, game_id):
+        with self._locked():
+            index = self._load_index()
+            entry = index.pop(game_id, None)
+            if entry is None:
+                return
+
+            self._save_index(index)
+            self._remove_unreferenced_blob(index, entry["digest"])
+
+
+@lru_cache()
+def default_cache() -> GameCache:
+    return GameCache()
+
+
+class ParsedGameCache(object):
+    """Pickled parse results, keyed by the payload digest and a parser version
+
+    Entries of other parser versions live in their own directory and are never
+    read, so changing the version invalidates everything parsed before it.
+    The oldest entries (by last read) are removed once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, version, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.version = str(version)
+        self.directory = os.path.join(
+            directory or os.path.join(common.cache_dir(), "parsed"), self.version
+        )
+        self.max_bytes = common.parsed_cache_max_bytes() if max_bytes is None else max_bytes
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest + ".pickle")
+
+    def get(self, digest):
+        path = self.path(digest)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Discarding unreadable parsed game %s", path)
+            return None
+
+        os.utime(path)
+        return value
+
+    def put(self, digest, value):
+        common.atomic_write(
+            self.path(digest), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        self._evict()
+
+    def get_or_create(self, digest, create):
+        value = self.get(digest)
+        if value is None:
+            value = create()
+            self.put(digest, value)
+
+        return value
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(x[1] for x in entries)
+        for _, size, path in sorted(entries)[:-1]:
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
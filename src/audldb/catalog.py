@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from . import common, get_audl_stats
+from .crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+@dataclass
+class CatalogGame:
+    game_id: str
+    date: str
+    away_team: str
+    home_team: str
+    status: str
+
+    @property
+    def url(self):
+        return get_audl_stats.create_game_url_from_game_id(self.game_id)
+
+    @property
+    def final(self):
+        return self.status.lower() == "final"
+
+
+def catalog_game_from_schedule(game) -> CatalogGame:
+    game_id = game["gameID"]
+    start = game.get("startTimestamp") or ""
+    return CatalogGame(
+        game_id,
+        start[:10] if start else game_id[:10],
+        game.get("awayTeamID", ""),
+        game.get("homeTeamID", ""),
+        game.get("status") or "",
+    )
+
+
+@dataclass
+class TeamCrawlState:
+    crawled: float
+    game_ids: List[str] = field(default_factory=list)
+
+
+class GameCatalog(object):
+    """Every known game, persisted along with when each team's schedule was last crawled"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(common.cache_dir(), "catalog.json")
+        self.games: Dict[str, CatalogGame] = {}
+        self.teams: Dict[str, TeamCrawlState] = {}
+        self.team_list: List[str] = []
+        self.teams_crawled: float = 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "GameCatalog":
+        catalog = cls(path)
+        try:
+            with open(catalog.path, "rb") as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return catalog
+        except ValueError:
+            logger.warning("Discarding corrupt game catalog at %s", catalog.path)
+            return catalog
+
+        if data.get("version") != CATALOG_VERSION:
+            return catalog
+
+        catalog.games = {x["game_id"]: CatalogGame(**x) for x in data["games"]}
+        catalog.teams = {k: TeamCrawlState(**v) for k, v in data["teams"].items()}
+        catalog.team_list = data["team_list"]
+        catalog.teams_crawled = data["teams_crawled"]
+        return catalog
+
+    def save(self):
+        data = {
+            "version": CATALOG_VERSION,
+            "team_list": self.team_list,
+            "teams_crawled": self.teams_crawled,
+            "teams": {k: asdict(v) for k, v in self.teams.items()},
+            "games": [asdict(x) for x in self.sorted_games()],
+        }
+        common.atomic_write(self.path, json.dumps(data).encode("utf-8"))
+
+    def sorted_games(self) -> List[CatalogGame]:
+        return [self.games[k] for k in sorted(self.games)]
+
+    def urls(self) -> List[str]:
+        return [x.url for x in self.sorted_games()]
+
+    def merge(self, games: Iterable[CatalogGame]) -> List[str]:
+        """Add new games and update changed ones, returning the ids that changed"""
+        changed = []
+        for game in games:
+            if self.games.get(game.game_id) != game:
+                self.games[game.game_id] = game
+                changed.append(game.game_id)
+
+        return changed
+
+    def team_needs_refresh(self, team, max_age, now=None) -> bool:
+        now = time.time() if now is None else now
+        state = self.teams.get(team)
+        if state is None or now - state.crawled > max_age:
+            return True
+
+        # a team with a game today or earlier that isn't final yet can still change.
+        # Games further out (every team has some in season) and finished ones wait
+        # until the schedule ages out
+        today = time.strftime("%Y-%m-%d", time.localtime(now))
+        return any(
+            not self.games[game_id].final and game_id[:10] <= today
+            for game_id in state.game_ids
+            if game_id in self.games
+        )
+
+
+def update_catalog(
+    catalog: Optional[GameCatalog] = None,
+    crawler: Optional[Crawler] = None,
+    max_age: float = 6 * 60 * 60,
+    team_list_max_age: float = 24 * 60 * 60,
+    save: bool = True,
+) -> List[str]:
+    """Crawl only the schedules that may have changed and merge them into the catalog"""
+    catalog = catalog if catalog is not None else GameCatalog.load()
+    crawler = crawler or Crawler()
+    now = time.time()
+
+    if len(catalog.team_list) == 0 or now - catalog.teams_crawled > team_list_max_age:
+        catalog.team_list = get_audl_stats.getTeams(crawler)
+        catalog.teams_crawled = now
+
+    teams = catalog.team_list
+
+    stale_teams = [x for x in teams if catalog.team_needs_refresh(x, max_age, now)]
+    result = crawler.crawl(
+        [get_audl_stats.schedule_url(team) for team in stale_teams],
+        parse=lambda response: get_audl_stats.parse_schedule_games(response.content),
+    )
+
+    changed = []
+    for team in stale_teams:
+        schedule = result.results.get(get_audl_stats.schedule_url(team))
+        if schedule is None:
+            continue
+
+        games = [catalog_game_from_schedule(x) for x in schedule]
+        changed.extend(catalog.merge(games))
+        catalog.teams[team] = TeamCrawlState(now, [x.game_id for x in games])
+
+    changed = list(dict.fromkeys(changed))
+    logger.info(
+        "Refreshed %d of %d team schedules, %d games changed, %d games in catalog",
+        len(result.results),
+        len(teams),
+        len(changed),
+        len(catalog.games),
+    )
+
+    if save:
+        catalog.save()
+
+    return changed
+
+
+class BackgroundCatalog(object):
+    """Serves the catalog snapshot on disk while refreshing it on a background thread
+
+    Loading never touches the network, so readers always get an answer straight
+    away and pick up new games once a refresh has finished.
+
+    Every process (gunicorn worker) has its own, but only one of them crawls at
+    a time, under a lock next to the catalog file. The others reload the file
+    when it changes, and skip their own crawl while it's newer than
+    ``refresh_interval``.
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh_interval: float = 15 * 60):
+        self.catalog = GameCatalog.load(path)
+        self.refresh_interval = refresh_interval
+        self.last_refresh: float = 0.0
+        self._loaded_mtime = self._catalog_mtime()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _catalog_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.catalog.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _reload_if_changed(self):
+        mtime = self._catalog_mtime()
+        if mtime is not None and mtime != self._loaded_mtime:
+            self._loaded_mtime = mtime
+            self.catalog = GameCatalog.load(self.catalog.path)
+
+    @property
+    def refreshing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def urls(self) -> List[str]:
+        if not self.refreshing:
+            self._reload_if_changed()
+        return self.catalog.urls()
+
+    def refresh(self, force=False) -> bool:
+        """Start a refresh unless one is running or the last one is recent"""
+        with self._lock:
+            if self.refreshing:
+                return False
+            if not force and time.time() - self.last_refresh < self.refresh_interval:
+                return False
+
+            self.last_refresh = time.time()
+            self._thread = threading.Thread(
+                target=self._refresh, args=(force,), name="catalog-refresh", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _refresh(self, force):
+        with common.file_lock(self.catalog.path + ".lock", blocking=False) as locked:
+            if not locked:
+                # another process is crawling, its catalog is read once it's saved
+                return
+
+            mtime = self._catalog_mtime()
+            if not force and mtime is not None and time.time() - mtime < self.refresh_interval:
+                self._reload_if_changed()
+                return
+
+            # update a copy so readers never see a half merged catalog
+            catalog = GameCatalog.load(self.catalog.path)
+            try:
+                update_catalog(catalog)
+            except Exception:
+                logger.exception("Failed to refresh the game catalog")
+                return
+
+            self._loaded_mtime = self._catalog_mtime()
+            self.catalog = catalog
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    update_catalog()
+
+
+if __name__ == "__main__":
+    main()
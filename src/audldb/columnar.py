@@ -0,0 +1,146 @@
+import numpy as np
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# event types, see the glossary in the README
+OFFENSE_LINE = 1
+DEFENSE_LINE = 2
+BLOCK = 5
+THROWAWAY = 8
+DROP = 19
+THROW = 20
+GOAL = 22
+
+
+@dataclass
+class EventColumns:
+    """One team's event stream as parallel arrays, one entry per event
+
+    Missing coordinates are ``nan`` and missing roster ids are ``-1``.
+    ``point_starts``/``point_stops`` are the event offsets of each point, with
+    points that have no line already filtered out, matching
+    ``filter_empty_points(events_per_point(events))``.
+    """
+
+    events: List[Dict]
+    t: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    r: np.ndarray
+    point_starts: np.ndarray
+    point_stops: np.ndarray
+
+    @property
+    def num_points(self) -> int:
+        return len(self.point_starts)
+
+    def point_events(self) -> List[List[Dict]]:
+        return [
+            self.events[start:stop]
+            for start, stop in zip(self.point_starts.tolist(), self.point_stops.tolist())
+        ]
+
+    def point_ids(self) -> np.ndarray:
+        """Index of the point each event belongs to, -1 for events in dropped points"""
+        positions = np.arange(len(self.t))
+        ids = np.searchsorted(self.point_starts, positions, side="right") - 1
+        outside = (ids < 0) | (positions >= self.point_stops[np.maximum(ids, 0)])
+        ids[outside] = -1
+        return ids
+
+    def point_stats(self) -> List[Dict[str, int]]:
+        return point_stats(self)
+
+
+def decode_events(events: List[Dict]) -> EventColumns:
+    # list comprehensions into np.array beat np.fromiter over generators here
+    t = np.array([e["t"] for e in events], dtype=np.int16)
+    x = np.array([e.get("x") for e in events], dtype=np.float64)
+    y = np.array([e.get("y") for e in events], dtype=np.float64)
+    r = np.array(
+        [-1 if (roster_id := e.get("r")) is None else roster_id for e in events],
+        dtype=np.int64,
+    )
+    has_line = np.array(["l" in e for e in events], dtype=bool)
+
+    starts, stops = _point_bounds(t, has_line)
+    return EventColumns(events, t, x, y, r, starts, stops)
+
+
+def _point_bounds(t, has_line) -> Tuple[np.ndarray, np.ndarray]:
+    if len(t) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    # every line event starts a new point, apart from one at the very start
+    line_events = np.flatnonzero((t == OFFENSE_LINE) | (t == DEFENSE_LINE))
+    starts = np.union1d([0], line_events).astype(np.int64)
+    stops = np.append(starts[1:], len(t))
+
+    keep = np.add.reduceat(has_line.astype(np.int64), starts) > 0
+    return starts[keep], stops[keep]
+
+
+def _per_point_sum(mask, point_ids, num_points) -> np.ndarray:
+    valid = point_ids >= 0
+    return np.bincount(point_ids[mask & valid], minlength=num_points)
+
+
+def point_stats(columns: EventColumns) -> List[Dict[str, int]]:
+    """Vectorized equivalent of the per-point counters in ``munging.Point``"""
+    num_points = columns.num_points
+    if num_points == 0:
+        return []
+
+    t = columns.t
+    point_ids = columns.point_ids()
+
+    # the type of the next event within the same point, -1 at the end of a point
+    next_t = np.full(len(t), -1, dtype=t.dtype)
+    next_t[:-1] = t[1:]
+    next_t[columns.point_stops - 1] = -1
+
+    throwaways = _per_point_sum(t == THROWAWAY, point_ids, num_points)
+    drops = _per_point_sum(t == DROP, point_ids, num_points)
+    blocks = _per_point_sum(t == BLOCK, point_ids, num_points)
+    completions = _per_point_sum(
+        (t == THROW) & ((next_t == THROW) | (next_t == GOAL)), point_ids, num_points
+    )
+    possessions = _possessions_per_point(columns, point_ids)
+
+    return [
+        {
+            "throwaways": int(a),
+            "drops": int(b),
+            "blocks": int(c),
+            "completions": int(d),
+            "possessions": int(e),
+        }
+        for a, b, c, d, e in zip(throwaways, drops, blocks, completions, possessions)
+    ]
+
+
+def _possessions_per_point(columns: EventColumns, point_ids) -> np.ndarray:
+    # A possession starts with the offense line, or with a throw while the team
+    # doesn't have the disc. Only throws and throwaways change whether the team
+    # has the disc, so look at the state left by the previous one of those in
+    # the same point (or the line, for the first one).
+    t = columns.t
+    has_disc_at_start = t[columns.point_starts] == OFFENSE_LINE
+
+    relevant = np.flatnonzero(((t == THROW) | (t == THROWAWAY)) & (point_ids >= 0))
+    relevant_t = t[relevant]
+    relevant_point = point_ids[relevant]
+
+    had_disc = np.empty(len(relevant), dtype=bool)
+    if len(relevant) > 0:
+        had_disc[1:] = relevant_t[:-1] == THROW
+        first_in_point = np.ones(len(relevant), dtype=bool)
+        first_in_point[1:] = relevant_point[1:] != relevant_point[:-1]
+        had_disc[first_in_point] = has_disc_at_start[relevant_point[first_in_point]]
+
+    new_possession = (relevant_t == THROW) & ~had_disc
+    return has_disc_at_start.astype(np.int64) + np.bincount(
+        relevant_point[new_possession], minlength=columns.num_points
+    )
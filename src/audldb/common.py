@@ -1,7 +1,16 @@
+import os
+import posixpath
+import tempfile
 import urllib.parse
 import plotly.graph_objects as go
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not on windows, where there's only ever the one process anyway
+    fcntl = None
 
 
 def root_audl_url():
@@ -14,3 +23,72 @@ def sol_games():
 
 def get_game_url(game_base_url):
     return urllib.parse.urljoin(root_audl_url(), game_base_url)
+
+
+def game_id_from_url(url):
+    return posixpath.split(urllib.parse.urlparse(url).path)[-1]
+
+
+def season_of(game_id) -> int:
+    return int(game_id[:4])
+
+
+def teams_of_game(game_id) -> Tuple[str, str]:
+    """``(away, home)`` from a game id like ``2021-06-25-AUS-SEA``"""
+    _, _, _, away, home = game_id.split("-", 4)
+    return away, home
+
+
+def cache_dir():
+    return os.environ.get(
+        "AUDLDB_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "audldb")
+    )
+
+
+def cache_max_bytes():
+    return int(os.environ.get("AUDLDB_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def parsed_cache_max_bytes():
+    return int(os.environ.get("AUDLDB_PARSED_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def clientside_plot():
+    """Whether the dashboard draws possessions in the browser, see assets/possession_plot.js"""
+    return os.environ.get("AUDLDB_CLIENTSIDE_PLOT", "").lower() not in ("", "0", "false", "no")
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """Exclusive lock on ``path`` between processes (gunicorn workers), yields whether it was taken
+
+    With ``blocking=False`` it doesn't wait for another process to let go,
+    the block just runs without the lock and gets ``False``.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is None:
+            yield True
+            return
+
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        # closing the file lets go of the lock
+        yield True
+
+
+def atomic_write(path, data: bytes):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,249 @@
+import numpy as np
+
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+from .munging import ParsedEvent, Player, Possession
+
+THROW_FLAGS = ("turnover", "throwaway", "block", "drop", "goal", "stall")
+THROW_FLAG_BITS = {name: np.uint8(1 << i) for i, name in enumerate(THROW_FLAGS)}
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class ThrowView(object):
+    """Read-only stand in for ``munging.Throw`` backed by a row of a ``ThrowTable``"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def thrower(self) -> Optional[Player]:
+        return self._table.player(self._table.thrower[self._row])
+
+    @property
+    def receiver(self) -> Optional[Player]:
+        return self._table.player(self._table.receiver[self._row])
+
+    @property
+    def throw_position_x(self) -> float:
+        return float(self._table.throw_x[self._row])
+
+    @property
+    def throw_position_y(self) -> float:
+        return float(self._table.throw_y[self._row])
+
+    @property
+    def receive_position_x(self) -> Optional[float]:
+        return _optional_float(self._table.receive_x[self._row])
+
+    @property
+    def receive_position_y(self) -> Optional[float]:
+        return _optional_float(self._table.receive_y[self._row])
+
+    def _flag(self, name) -> bool:
+        return bool(self._table.flags[self._row] & THROW_FLAG_BITS[name])
+
+    turnover = property(lambda self: self._flag("turnover"))
+    throwaway = property(lambda self: self._flag("throwaway"))
+    block = property(lambda self: self._flag("block"))
+    drop = property(lambda self: self._flag("drop"))
+    goal = property(lambda self: self._flag("goal"))
+    stall = property(lambda self: self._flag("stall"))
+
+    def __repr__(self):
+        return f"ThrowView(row={self._row})"
+
+
+class ThrowSlice(Sequence):
+    """The throws of one possession, as a window onto a ``ThrowTable``"""
+
+    __slots__ = ("_table", "_start", "_stop")
+
+    def __init__(self, table, start, stop):
+        self._table = table
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("throw index out of range")
+
+        return ThrowView(self._table, self._start + i)
+
+
+class ThrowTable(object):
+    """A game's throws packed into numpy arrays, one row per throw
+
+    Players are stored once in ``players`` and referenced by index (-1 for no
+    player), missing receive positions are ``nan`` and the booleans of each
+    throw are bits of ``flags``. Possessions are kept as row ranges, and
+    ``possessions()`` rebuilds ``Possession`` objects whose play by play is a
+    ``ThrowSlice`` rather than a list of ``Throw`` objects.
+    """
+
+    def __init__(self, possessions: List[Possession]):
+        players: List[Player] = []
+        player_index: Dict[int, int] = {}
+
+        def index_of(player):
+            if player is None:
+                return -1
+            key = id(player)
+            if key not in player_index:
+                player_index[key] = len(players)
+                players.append(player)
+            return player_index[key]
+
+        throws = [throw for possession in possessions for throw in possession.play_by_play]
+        self.players = players
+        self.thrower = np.array([index_of(x.thrower) for x in throws], dtype=np.int32)
+        self.receiver = np.array([index_of(x.receiver) for x in throws], dtype=np.int32)
+        self.throw_x = np.array([x.throw_position_x for x in throws], dtype=np.float64)
+        self.throw_y = np.array([x.throw_position_y for x in throws], dtype=np.float64)
+        self.receive_x = np.array([x.receive_position_x for x in throws], dtype=np.float64)
+        self.receive_y = np.array([x.receive_position_y for x in throws], dtype=np.float64)
+
+        self.flags = np.zeros(len(throws), dtype=np.uint8)
+        for name, bit in THROW_FLAG_BITS.items():
+            self.flags[np.array([getattr(x, name) for x in throws], dtype=bool)] |= bit
+
+        lengths = np.array([len(x.play_by_play) for x in possessions], dtype=np.int64)
+        self.possession_stops = np.cumsum(lengths)
+        self.possession_starts = self.possession_stops - lengths
+
+        # everything else about a possession is small, keep the objects minus their throws
+        lines = {}
+        self._possessions = [
+            (
+                x.point,
+                x.index,
+                x.team,
+                x.pulling_team,
+                lines.setdefault(tuple(index_of(p) for p in x.starting_line), len(lines)),
+                x.turnover,
+                x.throwaway,
+                x.block,
+                x.drop,
+                x.goal,
+                x.end_of_quarter,
+            )
+            for x in possessions
+        ]
+        self.lines = list(lines)
+
+        self.possession_point = np.array([x.point for x in possessions], dtype=np.int32)
+        self.possession_index = np.array([x.index for x in possessions], dtype=np.int32)
+        self.possession_team = np.array([x.team for x in possessions], dtype=object)
+
+    def __len__(self):
+        return len(self.thrower)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            x.nbytes
+            for x in (
+                self.thrower,
+                self.receiver,
+                self.throw_x,
+                self.throw_y,
+                self.receive_x,
+                self.receive_y,
+                self.flags,
+                self.possession_starts,
+                self.possession_stops,
+            )
+        )
+
+    def player(self, index) -> Optional[Player]:
+        return None if index < 0 else self.players[index]
+
+    def throws(self, possession_index) -> ThrowSlice:
+        return ThrowSlice(
+            self,
+            int(self.possession_starts[possession_index]),
+            int(self.possession_stops[possession_index]),
+        )
+
+    def possession(self, possession_index) -> Possession:
+        (
+            point,
+            index,
+            team,
+            pulling_team,
+            line,
+            turnover,
+            throwaway,
+            block,
+            drop,
+            goal,
+            end_of_quarter,
+        ) = self._possessions[possession_index]
+        return Possession(
+            point,
+            index,
+            team,
+            pulling_team,
+            [self.player(x) for x in self.lines[line]],
+            turnover,
+            throwaway,
+            block,
+            drop,
+            goal,
+            end_of_quarter,
+            self.throws(possession_index),
+        )
+
+    def possessions(self) -> "PossessionSequence":
+        return PossessionSequence(self)
+
+
+class PossessionSequence(Sequence):
+    """Lazily built ``Possession`` objects of a ``ThrowTable``"""
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return len(self.table._possessions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("possession index out of range")
+
+        return self.table.possession(i)
+
+
+def compact_parsed_event(parsed_event: ParsedEvent, keep_points=False) -> ParsedEvent:
+    """Swap the possessions of a parsed game for ones backed by a ``ThrowTable``
+
+    The points hold on to the raw events and their own play by play, so they're
+    dropped unless ``keep_points`` is set.
+    """
+    table = ThrowTable(parsed_event.possessions)
+    return ParsedEvent(
+        parsed_event.roster_id_map,
+        parsed_event.points if keep_points else [],
+        table.possessions(),
+    )
@@ -0,0 +1,155 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+
+from concurrent import futures
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@lru_cache()
+def get_session(pool_size=32) -> requests.Session:
+    """Process-wide session so every request reuses kept-alive connections"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@dataclass
+class RequestTiming:
+    url: str
+    status: Optional[int]
+    attempts: int
+    elapsed: float
+    error: Optional[str] = None
+
+
+@dataclass
+class CrawlResult:
+    results: Dict[str, object]
+    timings: List[RequestTiming]
+    total_time: float
+    failures: Dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def max_latency(self) -> float:
+        return max((x.elapsed for x in self.timings), default=0.0)
+
+
+class Crawler(object):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        max_workers: int = 32,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.25,
+        max_backoff: float = 4.0,
+    ):
+        self.session = session or get_session(max_workers)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = time.sleep
+
+    def _backoff_time(self, attempt):
+        # "full jitter", so retries from a whole crawl don't land on the server together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        start_time = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt > self.retries:
+                    response.raise_for_status()
+                    timing = RequestTiming(
+                        url, response.status_code, attempt, time.perf_counter() - start_time
+                    )
+                    if tracing.enabled():
+                        tracing.record("http_get", timing.elapsed)
+                    return response, timing
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt > self.retries:
+                    e.timing = RequestTiming(
+                        url, None, attempt, time.perf_counter() - start_time, repr(e)
+                    )
+                    raise
+
+            except requests.HTTPError as e:
+                e.timing = RequestTiming(
+                    url,
+                    e.response.status_code if e.response is not None else None,
+                    attempt,
+                    time.perf_counter() - start_time,
+                    repr(e),
+                )
+                raise
+
+            self._sleep(self._backoff_time(attempt))
+
+    def crawl(
+        self,
+        urls: Iterable[str],
+        parse: Callable[[requests.Response], object] = lambda x: x.json(),
+    ) -> CrawlResult:
+        urls = list(dict.fromkeys(urls))
+        results = {}
+        timings = []
+        failures = {}
+        lock = threading.Lock()
+
+        def fetch(url):
+            try:
+                response, timing = self.get(url)
+                value = parse(response)
+            except Exception as e:
+                timing = getattr(e, "timing", None)
+                with lock:
+                    failures[url] = e
+                    if timing is not None:
+                        timings.append(timing)
+                return
+
+            with lock:
+                results[url] = value
+                timings.append(timing)
+
+        start_time = time.perf_counter()
+        if len(urls) > 0:
+            # one worker per request up to the pool size, so a league sized crawl
+            # goes out in a single wave instead of serial batches
+            with futures.ThreadPoolExecutor(min(self.max_workers, len(urls))) as ex:
+                list(ex.map(fetch, urls))
+
+        result = CrawlResult(results, timings, time.perf_counter() - start_time, failures)
+        logger.info(
+            "Crawled %d urls in %.3fs (slowest request %.3fs, %d failed)",
+            len(urls),
+            result.total_time,
+            result.max_latency,
+            len(failures),
+        )
+        for url, e in failures.items():
+            logger.warning("Failed to crawl %s: %r", url, e)
+
+        return result
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from typing import Iterable, Mapping, Tuple, Union
+
+from .compact import THROW_FLAG_BITS, ThrowTable
+from .munging import ParsedEvent
+
+THROW_COLUMNS = [
+    "game_id",
+    "point",
+    "possession",
+    "possession_number",
+    "team",
+    "throw_number",
+    "thrower_id",
+    "receiver_id",
+    "thrower",
+    "receiver",
+    "throw_x",
+    "throw_y",
+    "receive_x",
+    "receive_y",
+    "turnover",
+    "throwaway",
+    "block",
+    "drop",
+    "goal",
+    "stall",
+]
+
+
+def _player_column(table, indices, attribute, dtype):
+    values = np.array(
+        [getattr(x, attribute) for x in table.players] + [None], dtype=object
+    )
+    # index -1 (no player) picks the trailing None
+    return pd.array(values[indices], dtype=dtype)
+
+
+def throws_frame(parsed_event: ParsedEvent, game_id: str = "") -> pd.DataFrame:
+    """One row per throw of a parsed game, see ``THROW_COLUMNS``"""
+    table = ThrowTable(list(parsed_event.possessions))
+    lengths = table.possession_stops - table.possession_starts
+    possession_number = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+
+    frame = pd.DataFrame(
+        {
+            "game_id": pd.Categorical([game_id] * len(table)),
+            "point": table.possession_point[possession_number],
+            "possession": table.possession_index[possession_number],
+            "possession_number": possession_number,
+            "team": pd.Categorical(table.possession_team[possession_number]),
+            "throw_number": (
+                np.arange(len(table)) - np.repeat(table.possession_starts, lengths)
+            ).astype(np.int32),
+            "thrower_id": _player_column(table, table.thrower, "player_id", "Int64"),
+            "receiver_id": _player_column(table, table.receiver, "player_id", "Int64"),
+            "thrower": _player_column(table, table.thrower, "short_name", "category"),
+            "receiver": _player_column(table, table.receiver, "short_name", "category"),
+            "throw_x": table.throw_x,
+            "throw_y": table.throw_y,
+            "receive_x": table.receive_x,
+            "receive_y": table.receive_y,
+        }
+    )
+    for name, bit in THROW_FLAG_BITS.items():
+        frame[name] = (table.flags & bit) != 0
+
+    return frame
+
+
+def season_throws_frame(
+    parsed_games: Union[Mapping[str, ParsedEvent], Iterable[Tuple[str, ParsedEvent]]]
+) -> pd.DataFrame:
+    """Every throw of every game in one table, keyed by ``game_id``"""
+    if isinstance(parsed_games, Mapping):
+        parsed_games = parsed_games.items()
+
+    frames = [throws_frame(parsed, game_id) for game_id, parsed in parsed_games]
+    if len(frames) == 0:
+        return throws_frame(ParsedEvent({}, [], []))
+
+    # concatenating categoricals with different categories falls back to object
+    frame = pd.concat(frames, ignore_index=True)
+    for column in ["game_id", "team", "thrower", "receiver"]:
+        frame[column] = frame[column].astype("category")
+
+    return frame
+
+
+def write_frame(frame: pd.DataFrame, path):
+    """Write to Parquet or Feather depending on the extension, both need pyarrow"""
+    path = str(path)
+    if path.endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    elif path.endswith(".feather"):
+        frame.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Can't tell the format of {path}, use .parquet or .feather")
+
+
+def read_frame(path) -> pd.DataFrame:
+    path = str(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    elif path.endswith(".feather"):
+        return pd.read_feather(path)
+    else:
+        raise ValueError(f"Can't tell the format of {path}, use .parquet or .feather")
@@ -3,6 +3,7 @@ import dash_bootstrap_components as dbc
 from dash import dcc
 from dash import html
 
+import json
 import numpy as np
 import os
 import pandas as pd
@@ -13,13 +14,32 @@ import plotly.graph_objects as go
 # from common import DataHolder, cache_dir, generate_dash_table, load_data
 from dash.dependencies import Input, Output
 from plotly.subplots import make_subplots
+from functools import lru_cache
 
+from . import heatmaps, tracing
+from .compact import THROW_FLAG_BITS, PossessionSequence, ThrowTable
 
+
+@tracing.traced("plot_field")
 def plot_field(fig=None, multi_factor=8, include_thirds=False):
+    """The field, drawn onto ``fig`` or a new figure
 
+    A new figure is a copy of one drawn (and validated) the first time it's
+    asked for, since the field never changes.
+    """
     if fig is None:
-        fig = go.Figure()
+        # parsing the JSON gives a fresh copy, and it's already been validated
+        return go.Figure(json.loads(_field_json(multi_factor, include_thirds)), _validate=False)
+
+    return draw_field(fig, multi_factor, include_thirds)
+
+
+@lru_cache()
+def _field_json(multi_factor=8, include_thirds=False) -> str:
+    return draw_field(go.Figure(), multi_factor, include_thirds).to_json()
 
+
+def draw_field(fig, multi_factor=8, include_thirds=False):
     fig.update_layout(
         yaxis=go.layout.YAxis(
             range=[-10, 110],
@@ -143,6 +163,27 @@ def plot_field(fig=None, multi_factor=8, include_thirds=False):
     return fig
 
 
+def plot_heatmap(fig, grid, name="", colorscale="Reds", opacity=0.6):
+    """Draw a ``heatmaps`` grid over the field, leaving empty cells see-through"""
+    x_edges = heatmaps.x_edges()
+    y_edges = heatmaps.y_edges()
+    z = np.where(grid > 0, grid, np.nan)
+
+    fig.add_trace(
+        go.Heatmap(
+            z=z,
+            x=(x_edges[1:] + x_edges[:-1]) / 2,
+            y=(y_edges[1:] + y_edges[:-1]) / 2,
+            colorscale=colorscale,
+            opacity=opacity,
+            showscale=False,
+            name=name,
+            hovertemplate="%{z}<extra>" + name + "</extra>",
+        )
+    )
+    return fig
+
+
 def determine_color(throw, receiver=False):
     if throw.throwaway:
         return "red"
@@ -171,6 +212,15 @@ def determine_name(throw, receiver=False):
     return "Completion"
 
 
+def _has_receive_position(throw) -> bool:
+    return throw.receive_position_x is not None and throw.receive_position_y is not None
+
+
+def _was_received(throw) -> bool:
+    """Whether there's a receiver to mark, a stall for one has none"""
+    return throw.receiver is not None and _has_receive_position(throw)
+
+
 def get_data_to_plot(throws):
     throw_points_y = [throw.throw_position_y - 10 for throw in throws]   
     throw_points_x = [throw.throw_position_x + 53.33 / 2 for throw in throws]
@@ -183,6 +233,7 @@ def get_data_to_plot(throws):
     return throw_points_x, throw_points_y, throwers, hover_text, colors, name
 
 
+@tracing.traced("plot_possession")
 def plot_possession(fig, possession):
     throws = [x for x in possession.play_by_play]
     completions = [x for x in throws if not x.throwaway and not x.goal]
@@ -263,63 +314,67 @@ def plot_possession(fig, possession):
     # plot the drops
     elif len(drops) > 0:
         drop = drops[0]
-        fig.add_trace(
-            go.Scatter(
-                x=[drop.receive_position_x + 53.33 / 2],
-                y=[drop.receive_position_y - 10],
-                mode='markers+text',
-                text=[drop.receiver.short_name],
-                textposition="top center",
-                hovertext=f"{drop.receiver.short_name}",
-                marker_size=10,
-                marker_color=determine_color(drop, receiver=True),
-                name=determine_name(drop, receiver=True)
+        if _was_received(drop):
+            fig.add_trace(
+                go.Scatter(
+                    x=[drop.receive_position_x + 53.33 / 2],
+                    y=[drop.receive_position_y - 10],
+                    mode='markers+text',
+                    text=[drop.receiver.short_name],
+                    textposition="top center",
+                    hovertext=f"{drop.receiver.short_name}",
+                    marker_size=10,
+                    marker_color=determine_color(drop, receiver=True),
+                    name=determine_name(drop, receiver=True)
+                )
             )
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=[x + 53.33 / 2 for x in [completions[-1].throw_position_x, completions[-1].receive_position_x]],
-                y=[y - 10 for y in [completions[-1].throw_position_y, completions[-1].receive_position_y]],
-                mode='lines',
-                line=dict(
-                    color="orange",
-                    width=1
+
+        if len(completions) > 0 and _has_receive_position(completions[-1]):
+            fig.add_trace(
+                go.Scatter(
+                    x=[x + 53.33 / 2 for x in [completions[-1].throw_position_x, completions[-1].receive_position_x]],
+                    y=[y - 10 for y in [completions[-1].throw_position_y, completions[-1].receive_position_y]],
+                    mode='lines',
+                    line=dict(
+                        color="orange",
+                        width=1
+                    ),
+                    showlegend=False
                 ),
-                showlegend=False
-            ),
-        )
+            )
 
     
     # plot the stalls
     elif len(stalls) > 0:
         stall = stalls[0]
-        fig.add_trace(
-            go.Scatter(
-                x=[stall.receive_position_x + 53.33 / 2],
-                y=[stall.receive_position_y - 10],
-                mode='markers+text',
-                text=[stall.receiver.short_name],
-                textposition="top center",
-                hovertext=f"{stall.receiver.short_name}",
-                marker_size=10,
-                marker_color=determine_color(stall, receiver=True),
-                name=determine_name(stall, receiver=True)
+        if _was_received(stall):
+            fig.add_trace(
+                go.Scatter(
+                    x=[stall.receive_position_x + 53.33 / 2],
+                    y=[stall.receive_position_y - 10],
+                    mode='markers+text',
+                    text=[stall.receiver.short_name],
+                    textposition="top center",
+                    hovertext=f"{stall.receiver.short_name}",
+                    marker_size=10,
+                    marker_color=determine_color(stall, receiver=True),
+                    name=determine_name(stall, receiver=True)
+                )
             )
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=[x + 53.33 / 2 for x in [completions[-1].throw_position_x, completions[-1].receive_position_x]],
-                y=[y - 10 for y in [completions[-1].throw_position_y, completions[-1].receive_position_y]],
-                mode='lines',
-                line=dict(
-                    color="orange",
-                    width=1
+
+        if len(completions) > 0 and _has_receive_position(completions[-1]):
+            fig.add_trace(
+                go.Scatter(
+                    x=[x + 53.33 / 2 for x in [completions[-1].throw_position_x, completions[-1].receive_position_x]],
+                    y=[y - 10 for y in [completions[-1].throw_position_y, completions[-1].receive_position_y]],
+                    mode='lines',
+                    line=dict(
+                        color="orange",
+                        width=1
+                    ),
+                    showlegend=False
                 ),
-                showlegend=False
-            ),
-        )
+            )
 
 
     # plot the throwaways
@@ -365,3 +420,191 @@ def plot_possession(fig, possession):
     )
 
     return fig
+
+
+def _marker_trace(x, y, text, hovertext, color, name):
+    # keys in the order plotly's to_dict gives them, so the JSON comes out the same too
+    return {
+        "hovertext": hovertext,
+        "marker": {"color": color, "size": 10},
+        "mode": "markers+text",
+        "name": name,
+        "text": text,
+        "textposition": "top center",
+        "x": x,
+        "y": y,
+        "type": "scatter",
+    }
+
+
+def _line_trace(x, y, color):
+    return {
+        "line": {"color": color, "width": 1},
+        "mode": "lines",
+        "showlegend": False,
+        "x": x,
+        "y": y,
+        "type": "scatter",
+    }
+
+
+@tracing.traced("possession_traces")
+def possession_traces(possession) -> list:
+    """The traces ``plot_possession`` adds, as the dicts plotly would turn them into
+
+    Every throw is looked at once, for its position on the plot and which of
+    the traces it goes in, and nothing goes through plotly's validation.
+    """
+    completions, goals, throwaways, drops, stalls = [], [], [], [], []
+    x, y, text, hovertext, colors = [], [], [], [], []
+    for i, throw in enumerate(possession.play_by_play):
+        x.append(throw.throw_position_x + 53.33 / 2)
+        y.append(throw.throw_position_y - 10)
+        text.append(throw.thrower.short_name)
+        hovertext.append(
+            f"id: {throw.thrower.short_name}, goal: {throw.goal}\n turnover: {throw.turnover}, drop: {throw.drop}"
+        )
+        colors.append(determine_color(throw))
+
+        if not throw.throwaway and not throw.goal:
+            completions.append((i, throw))
+        if not throw.turnover and throw.goal:
+            goals.append((i, throw))
+        if throw.throwaway and not throw.drop:
+            throwaways.append((i, throw))
+        if throw.drop:
+            drops.append((i, throw))
+        if throw.stall:
+            stalls.append((i, throw))
+
+    traces = []
+    for plays in [completions, throwaways, goals]:
+        rows = [i for i, _ in plays]
+        traces.append(
+            _marker_trace(
+                [x[i] for i in rows],
+                [y[i] for i in rows],
+                [text[i] for i in rows],
+                [hovertext[i] for i in rows],
+                [colors[i] for i in rows],
+                determine_name(plays[0][1]) if len(plays) > 0 else "",
+            )
+        )
+
+    # all of the lines
+    traces.append(_line_trace(x, y, "Black"))
+
+    def receive_marker(throw):
+        return _marker_trace(
+            [throw.receive_position_x + 53.33 / 2],
+            [throw.receive_position_y - 10],
+            [throw.receiver.short_name],
+            f"{throw.receiver.short_name}",
+            determine_color(throw, receiver=True),
+            determine_name(throw, receiver=True),
+        )
+
+    def throw_line(throw, color):
+        return _line_trace(
+            [throw.throw_position_x + 53.33 / 2, throw.receive_position_x + 53.33 / 2],
+            [throw.throw_position_y - 10, throw.receive_position_y - 10],
+            color,
+        )
+
+    # how the possession ended, same as plot_possession
+    if len(goals) > 0:
+        goal = goals[0][1]
+        traces += [receive_marker(goal), throw_line(goal, "green")]
+    elif len(drops) > 0 or len(stalls) > 0:
+        turnover = (drops or stalls)[0][1]
+        # nobody receives a stall, so it has no marker, and its line can be missing too
+        if _was_received(turnover):
+            traces.append(receive_marker(turnover))
+        if len(completions) > 0 and _has_receive_position(completions[-1][1]):
+            traces.append(throw_line(completions[-1][1], "orange"))
+    elif len(throwaways) > 0:
+        throwaway = throwaways[0][1]
+        if _has_receive_position(throwaway):
+            traces.append(throw_line(throwaway, "red"))
+
+    return traces
+
+
+def possession_annotation(possession) -> dict:
+    text_to_combine = [
+        f"Point: {possession.point + 1}",
+        f"Team: {possession.team.capitalize()}",
+        f"Possession on this point: {possession.index + 1}",
+        f"Team pulled: {possession.pulling_team}",
+        f"Num throws: {len(possession.play_by_play)}",
+    ]
+    return {
+        "align": "left",
+        "bordercolor": "black",
+        "borderwidth": 1,
+        "text": "<br>".join(text_to_combine),
+        "x": 0.2,
+        "xref": "paper",
+        "y": 0.5,
+        "yref": "paper",
+    }
+
+
+def possession_figure(possession, multi_factor=8, include_thirds=False) -> dict:
+    """``plot_possession(plot_field(), possession).to_dict()``, without building a ``go.Figure``
+
+    Dash takes the dict as a figure as it is, for a slider tick this is about
+    a tenth of the time of going through graph objects.
+    """
+    figure = json.loads(_field_json(multi_factor, include_thirds))
+    figure["data"] += possession_traces(possession)
+    figure["layout"]["annotations"] = [possession_annotation(possession)]
+    return figure
+
+
+def possession_patch(possession) -> dash.Patch:
+    """Turns a figure from ``possession_figure`` (or the bare field) into ``possession``'s
+
+    Only the traces and the annotation go to the browser, the field's shapes
+    and layout stay as they are. The field has no traces of its own, so the
+    possession's replace whatever is there.
+    """
+    patch = dash.Patch()
+    patch["data"] = possession_traces(possession)
+    patch["layout"]["annotations"] = [possession_annotation(possession)]
+    return patch
+
+
+def _plot_coordinates(values, offset) -> list:
+    return [None if np.isnan(x) else x for x in (values + offset).tolist()]
+
+
+@tracing.traced("possession_columns")
+def possession_columns(possessions) -> dict:
+    """Every possession of a game, packed for ``assets/possession_plot.js`` to draw in the browser
+
+    Throws are the columns of a ``ThrowTable``: positions already in plot
+    coordinates (``None`` where a throw has no receive position), players as
+    indexes into ``players`` (-1 for nobody) and the booleans as bits of
+    ``flags``. A possession is its range of throws and its annotation text.
+    """
+    if isinstance(possessions, PossessionSequence):
+        table = possessions.table
+    else:
+        table = ThrowTable(list(possessions))
+
+    return {
+        "players": [x.short_name for x in table.players],
+        "flag_bits": {k: int(v) for k, v in THROW_FLAG_BITS.items()},
+        "thrower": table.thrower.tolist(),
+        "receiver": table.receiver.tolist(),
+        # the same float arithmetic as possession_traces, so the browser plots the same numbers
+        "throw_x": _plot_coordinates(table.throw_x, 53.33 / 2),
+        "throw_y": _plot_coordinates(table.throw_y, -10),
+        "receive_x": _plot_coordinates(table.receive_x, 53.33 / 2),
+        "receive_y": _plot_coordinates(table.receive_y, -10),
+        "flags": table.flags.tolist(),
+        "starts": table.possession_starts.tolist(),
+        "stops": table.possession_stops.tolist(),
+        "annotations": [possession_annotation(x)["text"] for x in possessions],
+    }
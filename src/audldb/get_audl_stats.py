@@ -5,16 +5,19 @@ Description: Pull urls that store game data for AUDL games and store them in dat
 Date Created: 6/29/2021
 """
 
-from concurrent import futures
-import requests
 from bs4 import BeautifulSoup
+import logging
 import re
 import pandas as pd
 from datetime import datetime
-import time
 import json
 import urllib.parse
 
+from . import tracing
+from .crawler import Crawler, CrawlResult
+
+logger = logging.getLogger(__name__)
+
 currentDate = datetime.now()
 
 urls = []
@@ -52,9 +55,11 @@ teamsURL = 'https://theaudl.com/league/teams'
 statspage = 'https://www.backend.audlstats.com/stats-pages/game/'
 
 
-def getTeams():
+def getTeams(crawler=None):
+    crawler = crawler or Crawler()
+
     #Request the AUDL schedule site to get the rest of the URL information needed for the full stats page
-    teamsite = requests.get(teamsURL)
+    teamsite, _ = crawler.get(teamsURL)
 
     #Create a soup object
     soup = BeautifulSoup(teamsite.content, 'html.parser')
@@ -78,14 +83,17 @@ def create_game_url_from_game_id(game_id):
     return urllib.parse.urljoin(statspage, game_id)
 
 
-def getStats(team):
+def schedule_url(team):
     #AUDL schedule url
-    AUDLSchedule = f"https://www.backend.audlstats.com/web-api/games?current&teamID={team}"
+    return f"https://www.backend.audlstats.com/web-api/games?current&teamID={team}"
 
-    #Request the AUDL schedule site to get the rest of the URL information needed for the full stats page
-    site = requests.get(AUDLSchedule)
 
-    games = json.loads(site.content)["games"]
+def parse_schedule_games(content):
+    return json.loads(content)["games"]
+
+
+def parse_schedule(content):
+    games = parse_schedule_games(content)
 
     urls = []
     #For each game on the schedule find the unique identifier for each specific games full stats page
@@ -109,37 +117,49 @@ def getStats(team):
     return urls
 
 
-def get_audl_stat_urls():
+def getStats(team, crawler=None):
+    crawler = crawler or Crawler()
+
+    #Request the AUDL schedule site to get the rest of the URL information needed for the full stats page
+    site, _ = crawler.get(schedule_url(team))
+
+    return parse_schedule(site.content)
+
+
+def crawl_schedules(teams=None, crawler=None) -> CrawlResult:
+    crawler = crawler or Crawler()
+
     #Find all current AUDL teams
-    AUDLteams = getTeams()
-
-    #Find the stats for every game that each AUDL team has played
-    start_time = time.time()
-
-    # final_url_list = set()
-    # for team in AUDLteams:
-    #     url_list = getStats(team)
-    #     for url in url_list:
-    #         final_url_list.add(url)
-
-    result_futures = []
-    with futures.ThreadPoolExecutor(8) as ex:
-        for team in AUDLteams:
-            result_futures.append(ex.submit(getStats, team))
-
-        final_url_list = set()
-        for url_list_future in futures.as_completed(result_futures):
-            url_list = url_list_future.result()
-            for url in url_list:
-                final_url_list.add(url)
-
-    end_time = time.time()
-    print(f"total time taken: {end_time - start_time}")
+    if teams is None:
+        teams = getTeams(crawler)
+
+    #Find the stats for every game that each AUDL team has played, all schedules are
+    #requested at once over the shared connection pool
+    return crawler.crawl(
+        [schedule_url(team) for team in teams],
+        parse=lambda response: parse_schedule(response.content),
+    )
+
+
+def get_audl_stat_urls(crawler=None):
+    with tracing.stage("crawl_schedules"):
+        result = crawl_schedules(crawler=crawler)
+
+    # each game shows up on both teams' schedules
+    final_url_list = set()
+    for url_list in result.results.values():
+        for url in url_list:
+            final_url_list.add(url)
+
+    logger.info("Found %d games from %d schedules", len(final_url_list), len(result.results))
     return final_url_list
 
 
 def main():
+    logging.basicConfig(level=logging.INFO)
+    tracing.enable()
     game_urls = get_audl_stat_urls()
+    tracing.log_summary()
     
     df = pd.DataFrame({'Team Stat urls': game_urls})
 
@@ -0,0 +1,237 @@
+"""
+Binned counts of where throws, receptions and turnovers happen on the field.
+
+Grids are in the coordinates ``game.plot_field`` draws in (x from 0 to 53.33,
+y from -10 to 110), ``Y_BINS`` rows by ``X_BINS`` columns, and are kept per
+season, per team and per player under keys like ``season:2021``,
+``team:SEA`` and ``player:1234``. Each game is binned once, with numpy, and
+added to running totals, see ``HeatmapStore``.
+"""
+
+import io
+import logging
+import os
+
+import numpy as np
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from . import common, munging
+from .compact import THROW_FLAG_BITS, PossessionSequence, ThrowTable
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_VERSION = 2
+
+KINDS = ("throws", "receptions", "turnovers")
+X_BINS = 16
+Y_BINS = 36
+X_RANGE = (0.0, 53.33)
+Y_RANGE = (-10.0, 110.0)
+
+
+def x_edges() -> np.ndarray:
+    return np.linspace(X_RANGE[0], X_RANGE[1], X_BINS + 1)
+
+
+def y_edges() -> np.ndarray:
+    return np.linspace(Y_RANGE[0], Y_RANGE[1], Y_BINS + 1)
+
+
+def bin_index(x, y) -> np.ndarray:
+    """Flat grid cell of each event position, -1 where there's no position
+
+    Positions are in event coordinates and are moved into plot coordinates
+    the same way ``game.get_data_to_plot`` does. Anything off the field is
+    counted in the nearest edge cell.
+    """
+    plot_x = np.asarray(x, dtype=np.float64) + 53.33 / 2
+    plot_y = np.asarray(y, dtype=np.float64) - 10
+    missing = np.isnan(plot_x) | np.isnan(plot_y)
+
+    with np.errstate(invalid="ignore"):
+        column = (plot_x - X_RANGE[0]) / (X_RANGE[1] - X_RANGE[0]) * X_BINS
+        row = (plot_y - Y_RANGE[0]) / (Y_RANGE[1] - Y_RANGE[0]) * Y_BINS
+        column = np.clip(np.nan_to_num(column), 0, X_BINS - 1).astype(np.int64)
+        row = np.clip(np.nan_to_num(row), 0, Y_BINS - 1).astype(np.int64)
+
+    index = row * X_BINS + column
+    index[missing] = -1
+    return index
+
+
+@dataclass
+class GameHeatmaps:
+    """One game's grids, ``grids[i]`` holds the ``KINDS`` grids of ``keys[i]``"""
+
+    game_id: str
+    digest: Optional[str]
+    keys: List[str]
+    grids: np.ndarray
+
+
+def game_heatmaps(game_id, parsed_event: munging.ParsedEvent, digest=None) -> GameHeatmaps:
+    """Bin every throw of a parsed game into its season, team and player grids"""
+    possessions = parsed_event.possessions
+    if isinstance(possessions, PossessionSequence):
+        table = possessions.table
+    else:
+        table = ThrowTable(list(possessions))
+
+    away_team, home_team = common.teams_of_game(game_id)
+    keys = [f"season:{common.season_of(game_id)}", f"team:{home_team}", f"team:{away_team}"]
+    key_index = {x: i for i, x in enumerate(keys)}
+    # players come from the table by position, several of them can be the same player
+    player_keys = np.array(
+        [key_index.setdefault(f"player:{x.player_id}", len(key_index)) for x in table.players] + [-1],
+        dtype=np.int64,
+    )
+    keys = list(key_index)
+
+    lengths = table.possession_stops - table.possession_starts
+    is_home = np.repeat(table.possession_team == "home", lengths)
+    team = np.where(is_home, 1, 2)
+    season = np.zeros(len(table), dtype=np.int64)
+
+    turnover = (table.flags & THROW_FLAG_BITS["turnover"]) != 0
+    drop = (table.flags & THROW_FLAG_BITS["drop"]) != 0
+    throw_bins = bin_index(table.throw_x, table.throw_y)
+    receive_bins = bin_index(table.receive_x, table.receive_y)
+    # a throwaway or a drop is where the disc ended up, a block or a stall where it was thrown from
+    turnover_bins = np.where(receive_bins >= 0, receive_bins, throw_bins)
+
+    throwers = player_keys[table.thrower]
+    receivers = player_keys[table.receiver]
+    caught = ~turnover & (receive_bins >= 0) & (receivers >= 0)
+    # a drop is on the receiver, every other turnover on the thrower, as in query and season
+    turned_over_by = np.where(drop, receivers, throwers)
+
+    key, kind, cell = [], [], []
+    for keys_of_throws, keys_of_turnovers in [(season, season), (team, team), (throwers, turned_over_by)]:
+        key += [keys_of_throws, keys_of_turnovers[turnover]]
+        kind += [np.full(len(table), 0), np.full(turnover.sum(), 2)]
+        cell += [throw_bins, turnover_bins[turnover]]
+    for keys_of_throws in [season, team, receivers]:
+        key.append(keys_of_throws[caught])
+        kind.append(np.full(caught.sum(), 1))
+        cell.append(receive_bins[caught])
+
+    key, kind, cell = np.concatenate(key), np.concatenate(kind), np.concatenate(cell)
+    counted = (key >= 0) & (cell >= 0)
+    num_cells = Y_BINS * X_BINS
+    grids = np.bincount(
+        (key[counted] * len(KINDS) + kind[counted]) * num_cells + cell[counted],
+        minlength=len(keys) * len(KINDS) * num_cells,
+    ).astype(np.int32)
+
+    return GameHeatmaps(game_id, digest, keys, grids.reshape(len(keys), len(KINDS), Y_BINS, X_BINS))
+
+
+class HeatmapStore(object):
+    """Running total grids over the games added so far, persisted as ``.npz``
+
+    Each game's grids are kept too, so adding a game again replaces what it
+    added before.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(common.cache_dir(), "heatmaps.npz")
+        self.games: Dict[str, GameHeatmaps] = {}
+        self.totals: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "HeatmapStore":
+        store = cls(path)
+        try:
+            data = np.load(store.path, allow_pickle=False)
+        except FileNotFoundError:
+            return store
+        except ValueError:
+            logger.warning("Discarding corrupt heatmaps at %s", store.path)
+            return store
+
+        with data:
+            if int(data["version"]) != HEATMAP_VERSION:
+                return store
+
+            for game_id, digest in zip(data["game_ids"].tolist(), data["digests"].tolist()):
+                store.add(
+                    GameHeatmaps(
+                        game_id,
+                        digest or None,
+                        data[f"{game_id}/keys"].tolist(),
+                        data[f"{game_id}/grids"],
+                    )
+                )
+        return store
+
+    def save(self):
+        game_ids = sorted(self.games)
+        arrays = {
+            "version": np.array(HEATMAP_VERSION),
+            "game_ids": np.array(game_ids, dtype=str),
+            "digests": np.array([self.games[x].digest or "" for x in game_ids], dtype=str),
+        }
+        for game_id in game_ids:
+            arrays[f"{game_id}/keys"] = np.array(self.games[game_id].keys, dtype=str)
+            arrays[f"{game_id}/grids"] = self.games[game_id].grids
+
+        f = io.BytesIO()
+        np.savez_compressed(f, **arrays)
+        common.atomic_write(self.path, f.getvalue())
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def _add(self, heatmaps: GameHeatmaps, sign):
+        for key, grids in zip(heatmaps.keys, heatmaps.grids):
+            total = self.totals.get(key)
+            if total is None:
+                total = self.totals[key] = np.zeros((len(KINDS), Y_BINS, X_BINS), dtype=np.int64)
+            total += sign * grids
+            if sign < 0 and not total.any():
+                del self.totals[key]
+
+    def add(self, heatmaps: GameHeatmaps):
+        self.remove(heatmaps.game_id)
+        self.games[heatmaps.game_id] = heatmaps
+        self._add(heatmaps, 1)
+
+    def add_game(self, game_id, parsed_event: munging.ParsedEvent, digest=None):
+        self.add(game_heatmaps(game_id, parsed_event, digest))
+
+    def remove(self, game_id):
+        heatmaps = self.games.pop(game_id, None)
+        if heatmaps is not None:
+            self._add(heatmaps, -1)
+
+    def update_from_archive(self, archive_path, registry=None) -> List[str]:
+        """Add the games of an ingest archive that are new or changed, returning their ids"""
+        # only the archive needs ingest, the dashboard doesn't
+        from . import ingest
+
+        registry = registry if registry is not None else munging.PlayerRegistry()
+        changed = []
+        digests = {k: v.digest for k, v in self.games.items()}
+        for game_id, digest, game_info in ingest.iter_changed_games(archive_path, digests):
+            try:
+                parsed = munging.ParsedEvent(*munging.parse_events(game_info, registry=registry))
+            except Exception as e:
+                logger.warning("Leaving %s out of the heatmaps: %r", game_id, e)
+                continue
+
+            self.add_game(game_id, parsed, digest)
+            changed.append(game_id)
+
+        return changed
+
+    def grid(self, key, kind="throws") -> np.ndarray:
+        """``Y_BINS`` by ``X_BINS`` counts for ``key``, zeros if nothing was counted
+
+        A copy, changing it doesn't change the store.
+        """
+        total = self.totals.get(key)
+        if total is None:
+            return np.zeros((Y_BINS, X_BINS), dtype=np.int64)
+        return total[KINDS.index(kind)].copy()
@@ -0,0 +1,293 @@
+"""
+Download whole seasons of games into a single append-only archive.
+
+The archive is a sequence of gzip members, one per game, each holding a single
+JSON line of ``{"game_id": ..., "game": ...}``. That makes it a valid
+multi-member ``.jsonl.gz`` that ``gzip.open`` can stream end to end, while the
+``<archive>.index.json`` next to it records the byte range of every game so it
+can be read back individually. The index is rewritten after every game and is
+the checkpoint: on restart anything past the last indexed byte is truncated and
+only the missing games are downloaded. An index that's missing or unreadable is
+rebuilt from the archive itself.
+
+    python -m audldb.ingest games.jsonl.gz --season 2021 --season 2022
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+from concurrent import futures
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import cache, common, get_audl_stats, munging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_INDEX_VERSION = 1
+
+
+@dataclass
+class ArchiveIndex:
+    path: str
+    end: int
+    games: Dict[str, Dict]
+
+    @classmethod
+    def load(cls, archive_path) -> "ArchiveIndex":
+        path = archive_path + ".index.json"
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return cls(path, 0, {})
+
+        if data.get("version") != ARCHIVE_INDEX_VERSION:
+            raise ValueError(f"Unsupported archive index version in {path}")
+
+        return cls(path, data["end"], data["games"])
+
+    @classmethod
+    def rebuild(cls, archive_path) -> "ArchiveIndex":
+        """Index of an archive read from its members, up to the last complete one"""
+        index = cls(archive_path + ".index.json", 0, {})
+        with open(archive_path, "rb") as f:
+            while True:
+                f.seek(index.end)
+                member = _read_member(f)
+                if member is None:
+                    break
+
+                line, length = member
+                try:
+                    game_id = json.loads(line)["game_id"]
+                except (ValueError, KeyError, TypeError):
+                    break
+
+                index.games[game_id] = {
+                    "offset": index.end,
+                    "length": length,
+                    "digest": hashlib.sha256(line).hexdigest(),
+                }
+                index.end += length
+
+        return index
+
+    def save(self):
+        data = {"version": ARCHIVE_INDEX_VERSION, "end": self.end, "games": self.games}
+        common.atomic_write(self.path, json.dumps(data).encode("utf-8"))
+
+
+def _read_member(f, chunk_size=64 * 1024) -> Optional[Tuple[bytes, int]]:
+    """Decompressed content and compressed length of the gzip member at ``f``'s position
+
+    ``None`` at the end of the file, or when what's there isn't a whole member.
+    """
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    parts = []
+    length = 0
+    try:
+        while not decompressor.eof:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return None
+            parts.append(decompressor.decompress(chunk))
+            length += len(chunk)
+    except zlib.error:
+        return None
+
+    return b"".join(parts), length - len(decompressor.unused_data)
+
+
+class ArchiveWriter(object):
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.index = ArchiveIndex.load(path)
+            index_loaded = os.path.exists(self.index.path)
+        except ValueError:
+            index_loaded = False
+
+        # without the index, the games already in the archive are only known from the archive
+        if not index_loaded and os.path.exists(path):
+            logger.warning("Rebuilding the index of %s from the archive", path)
+            self.index = ArchiveIndex.rebuild(path)
+            self.index.save()
+
+        # drop anything written after the last checkpoint, it may be a partial member
+        mode = "r+b" if os.path.exists(path) else "wb"
+        self._file = open(path, mode)
+        self._file.truncate(self.index.end)
+        self._file.seek(self.index.end)
+
+    def __contains__(self, game_id):
+        return game_id in self.index.games
+
+    def append(self, game_id, game_info):
+        line = json.dumps({"game_id": game_id, "game": game_info}).encode("utf-8") + b"\n"
+        member = gzip.compress(line)
+
+        offset = self.index.end
+        self._file.write(member)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.index.games[game_id] = {
+            "offset": offset,
+            "length": len(member),
+            "digest": hashlib.sha256(line).hexdigest(),
+        }
+        self.index.end = offset + len(member)
+        self.index.save()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_game(path, game_id, index: Optional[ArchiveIndex] = None):
+    index = index or ArchiveIndex.load(path)
+    entry = index.games[game_id]
+    with open(path, "rb") as f:
+        f.seek(entry["offset"])
+        member = f.read(entry["length"])
+
+    return json.loads(gzip.decompress(member))["game"]
+
+
+def iter_archive(path) -> Iterator[Tuple[str, Dict]]:
+    index = ArchiveIndex.load(path)
+    with open(path, "rb") as f:
+        for game_id, entry in sorted(index.games.items(), key=lambda x: x[1]["offset"]):
+            f.seek(entry["offset"])
+            record = json.loads(gzip.decompress(f.read(entry["length"])))
+            yield record["game_id"], record["game"]
+
+
+def iter_changed_games(path, digests: Dict[str, str]) -> Iterator[Tuple[str, str, Dict]]:
+    """``(game_id, digest, game_info)`` of archived games whose digest isn't the one in ``digests``
+
+    For stores built from an archive, to only go over the games that are new
+    or changed since they were last updated.
+    """
+    index = ArchiveIndex.load(path)
+    with open(path, "rb") as f:
+        for game_id, entry in sorted(index.games.items(), key=lambda x: x[1]["offset"]):
+            if digests.get(game_id) == entry["digest"]:
+                continue
+
+            f.seek(entry["offset"])
+            record = json.loads(gzip.decompress(f.read(entry["length"])))
+            yield game_id, entry["digest"], record["game"]
+
+
+def select_game_urls(
+    game_urls: Iterable[str], seasons: Optional[List[int]] = None
+) -> List[str]:
+    return sorted(
+        url
+        for url in game_urls
+        if not seasons or common.season_of(common.game_id_from_url(url)) in seasons
+    )
+
+
+def ingest(
+    archive_path,
+    game_urls: Iterable[str],
+    workers: int = 4,
+    include_unfinished: bool = False,
+) -> Dict[str, List[str]]:
+    summary = {"written": [], "skipped": [], "unfinished": [], "failed": []}
+
+    with ArchiveWriter(archive_path) as writer:
+        pending = []
+        for url in game_urls:
+            game_id = common.game_id_from_url(url)
+            if game_id in writer:
+                summary["skipped"].append(game_id)
+            else:
+                pending.append(url)
+
+        logger.info(
+            "%d games already archived, downloading %d", len(summary["skipped"]), len(pending)
+        )
+
+        # downloads run concurrently but only the main thread writes to the archive
+        with futures.ThreadPoolExecutor(workers) as ex:
+            result_futures = {ex.submit(munging.get_data, url): url for url in pending}
+            try:
+                _write_completed(writer, result_futures, include_unfinished, summary)
+            except BaseException:
+                # an interrupted run keeps everything up to the last checkpoint
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return summary
+
+
+def _write_completed(writer, result_futures, include_unfinished, summary):
+    for future in futures.as_completed(result_futures):
+        game_id = common.game_id_from_url(result_futures[future])
+        try:
+            game_info = future.result()
+        except Exception as e:
+            logger.warning("Failed to download %s: %r", game_id, e)
+            summary["failed"].append(game_id)
+            continue
+
+        if not include_unfinished and not cache.game_is_final(game_info):
+            summary["unfinished"].append(game_id)
+            continue
+
+        writer.append(game_id, game_info)
+        summary["written"].append(game_id)
+        logger.info(
+            "Archived %s (%d/%d)", game_id, len(summary["written"]), len(result_futures)
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download AUDL games into a compressed archive")
+    parser.add_argument("archive", help="path of the .jsonl.gz archive to create or resume")
+    parser.add_argument(
+        "--season", type=int, action="append", help="only ingest games from this season, repeatable"
+    )
+    parser.add_argument(
+        "--game-id", action="append", help="ingest this game instead of crawling schedules, repeatable"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="concurrent downloads")
+    parser.add_argument(
+        "--include-unfinished", action="store_true", help="also archive games that aren't final"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.game_id:
+        game_urls = [get_audl_stats.create_game_url_from_game_id(x) for x in args.game_id]
+    else:
+        game_urls = get_audl_stats.get_audl_stat_urls()
+
+    summary = ingest(
+        args.archive,
+        select_game_urls(game_urls, args.season),
+        workers=args.workers,
+        include_unfinished=args.include_unfinished,
+    )
+    logger.info(", ".join(f"{k}: {len(v)}" for k, v in summary.items()))
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
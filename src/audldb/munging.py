@@ -1,13 +1,20 @@
 from typing import Union, Dict, List, Tuple
-from . import common
+from . import cache, columnar, common, tracing
+import hashlib
 import json
-import requests
+import threading
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
 
+# bump whenever a change to parsing changes its output, so that
+# games parsed by older code are not read back from the parsed game cache.
+# That includes changes to what's pickled, like the objects a parse is made of
+PARSER_VERSION = 2
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Player:
     id: int
     team_season_id: int
@@ -17,7 +24,7 @@ class Player:
     short_name: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Pull:
     player: Union[Player, None]
     x: float
@@ -25,7 +32,7 @@ class Pull:
     hangtime_ms: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Throw:
     thrower: Union[Player, None]
     receiver: Union[Player, None]
@@ -114,9 +121,80 @@ def get_num_possessions(point):
     return running_sum
 
 
-def get_data(url):
+class PointStats(object):
+    """Accumulates every per-point stat for one team in a single pass over its events
+
+    Stats that only count an event type are listed in ``event_type_stats`` and
+    read off a tally of event types, so adding one of those is a one line
+    change. For stats that depend on the surrounding events, subclass, define
+    ``update(event, previous_t)`` (it's called for every event in the same
+    pass) and extend ``result``. Gives the same numbers as the ``get_num_*``
+    functions.
+    """
+
+    event_type_stats = {"throwaways": 8, "drops": 19, "blocks": 5}
+    update = None
+
+    def __init__(self):
+        self.type_counts: Dict[int, int] = {}
+        self.completions = 0
+        self.possessions = 0
+
+    def consume(self, point):
+        type_counts = self.type_counts
+        update = self.update
+        completions = 0
+        has_possession = len(point) > 0 and point[0]["t"] == 1
+        possessions = int(has_possession)
+        previous_t = None
+
+        # completions look back at the previous throw instead of ahead, which
+        # is the same thing within a point
+        for event in point:
+            t = event["t"]
+            type_counts[t] = type_counts.get(t, 0) + 1
+
+            if t == 20:
+                if previous_t == 20:
+                    completions += 1
+                if not has_possession:
+                    possessions += 1
+                    has_possession = True
+            elif t == 8:
+                has_possession = False
+            elif t == 22 and previous_t == 20:
+                completions += 1
+
+            if update is not None:
+                update(event, previous_t)
+
+            previous_t = t
+
+        self.completions += completions
+        self.possessions += possessions
+
+    def result(self) -> Dict[str, int]:
+        stats = {k: self.type_counts.get(v, 0) for k, v in self.event_type_stats.items()}
+        stats["completions"] = self.completions
+        stats["possessions"] = self.possessions
+        return stats
+
+    @classmethod
+    def from_events(cls, point) -> Dict[str, int]:
+        accumulator = cls()
+        accumulator.consume(point)
+        return accumulator.result()
+
+
+def get_data(url, game_cache=None):
     # url = common.get_game_url(base_url)
-    game_info = json.loads(requests.get(url).content)
+    if game_cache is None:
+        game_cache = cache.default_cache()
+
+    with tracing.stage("fetch"):
+        content = game_cache.get(url)
+    with tracing.stage("decode_payload"):
+        game_info = json.loads(content)
 
     return game_info
 
@@ -131,12 +209,19 @@ def get_player_from_id(roster_id_map, roster_id) -> Union[Player, None]:
 
 
 class Point(object):
-    def __init__(self, home_point_event, away_point_event, roster_id_map):
+    def __init__(
+        self,
+        home_point_event,
+        away_point_event,
+        roster_id_map,
+        home_stats=None,
+        away_stats=None,
+    ):
         self.home_point_event = home_point_event
         self.away_point_event = away_point_event
 
         self.pulling_team = get_pulling_team(home_point_event, away_point_event)
-        self.receiving_team = get_pulling_team(home_point_event, away_point_event)
+        self.receiving_team = get_receiving_team(home_point_event, away_point_event)
         self.scoring_team = get_scoring_team(home_point_event, away_point_event)
         self.home_players = [
             get_player_from_id(roster_id_map, roster_id)
@@ -147,15 +232,13 @@ class Point(object):
             for roster_id in away_point_event[0]["l"]
         ]
 
-        stat_key_map = {
-            "throwaways": get_num_throwaways,
-            "drops": get_num_drops,
-            "blocks": get_num_blocks,
-            "completions": get_num_completions,
-            "possessions": get_num_possessions,
-        }
-        self.home_stats = {k: v(home_point_event) for k, v in stat_key_map.items()}
-        self.away_stats = {k: v(away_point_event) for k, v in stat_key_map.items()}
+        if home_stats is None:
+            home_stats = PointStats.from_events(home_point_event)
+        if away_stats is None:
+            away_stats = PointStats.from_events(away_point_event)
+
+        self.home_stats = home_stats
+        self.away_stats = away_stats
 
         self.play_by_play = None
 
@@ -186,54 +269,86 @@ def events_per_point(events):
     return points
 
 
-def get_roster_id_map(game_info):
-    roster_id_to_player = {
-        x["id"]: Player(
-            x["id"],
-            x["team_season_id"],
-            x["player_id"],
-            x["jersey_number"],
-            x["player"]["first_name"] + " " + x["player"]["last_name"],
-            x["player"]["ext_player_id"],
+def player_from_roster_entry(entry) -> Player:
+    return Player(
+        entry["id"],
+        entry["team_season_id"],
+        entry["player_id"],
+        entry["jersey_number"],
+        entry["player"]["first_name"] + " " + entry["player"]["last_name"],
+        entry["player"]["ext_player_id"],
+    )
+
+
+class PlayerRegistry(object):
+    """Season wide store of players, so each one is a single ``Player`` across games
+
+    Roster entries are interned on everything that goes into a ``Player``, so
+    the same roster entry in two games gives back the same object. Players
+    are looked up by ``player_id`` (or ``ext_player_id`` with ``find``), which
+    is what aggregates across games should be keyed on, since roster ids
+    change from one team season to the next.
+    """
+
+    def __init__(self):
+        self._interned: Dict[Tuple, Player] = {}
+        self.players: Dict[int, Player] = {}
+        self._ext_player_ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, player_id):
+        return player_id in self.players
+
+    def intern(self, entry) -> Player:
+        person = entry["player"]
+        key = (
+            entry["id"],
+            entry["team_season_id"],
+            entry["player_id"],
+            entry["jersey_number"],
+            person["first_name"],
+            person["last_name"],
+            person["ext_player_id"],
         )
-        for x in game_info["rostersHome"]
-    }
+        player = self._interned.get(key)
+        if player is None:
+            player = self._interned[key] = player_from_roster_entry(entry)
+            # the latest entry wins, e.g. after a trade
+            self.players[player.player_id] = player
+            self._ext_player_ids[player.short_name] = player.player_id
+
+        return player
+
+    def get(self, player_id) -> Union[Player, None]:
+        return self.players.get(player_id)
+
+    def find(self, ext_player_id) -> Union[Player, None]:
+        player_id = self._ext_player_ids.get(ext_player_id)
+        return None if player_id is None else self.players[player_id]
+
+    def roster_id_map(self, game_info) -> Dict[int, Player]:
+        roster_id_to_player = {x["id"]: self.intern(x) for x in game_info["rostersHome"]}
+        roster_id_to_player.update({x["id"]: self.intern(x) for x in game_info["rostersAway"]})
+        return roster_id_to_player
+
 
+def get_roster_id_map(game_info, registry=None):
+    """Roster id to ``Player`` for both teams, shared with other games through ``registry``"""
+    if registry is not None:
+        return registry.roster_id_map(game_info)
+
+    roster_id_to_player = {
+        x["id"]: player_from_roster_entry(x) for x in game_info["rostersHome"]
+    }
     roster_id_to_player.update(
-        {
-            x["id"]: Player(
-                x["id"],
-                x["team_season_id"],
-                x["player_id"],
-                x["jersey_number"],
-                x["player"]["first_name"] + " " + x["player"]["last_name"],
-                x["player"]["ext_player_id"],
-            )
-            for x in game_info["rostersAway"]
-        }
+        {x["id"]: player_from_roster_entry(x) for x in game_info["rostersAway"]}
     )
 
     return roster_id_to_player
 
 
-def return_indices(
-    action,
-    new_o_index,
-    new_d_index,
-    previous_possession,
-    new_possession,
-    point_over=False,
-):
-    if previous_possession == "o":
-        return_value = action, new_o_index, new_d_index, new_possession, point_over
-    elif previous_possession == "d":
-        return_value = action, new_d_index, new_o_index, new_possession, point_over
-    else:
-        raise ValueError("previous_possession must be one of ['o', 'd']")
-    
-    return return_value
-
-
 def change_possession(possession) -> str:
     if possession == "o":
         return_value = "d"
@@ -245,305 +360,204 @@ def change_possession(possession) -> str:
     return return_value
 
 
-def handle_next_step(
-    roster_id_map,
-    starting_o_event,
-    starting_d_event,
-    o_index,
-    d_index,
-    possession,
-) -> Tuple[Union[None, Pull, Throw], int, int, str, bool]:
-
-    if o_index > (len(starting_o_event) - 1) or d_index > (len(starting_d_event) - 1):
-        action = None
-        return return_indices(action, o_index, d_index, possession, possession, True)
-
-    if starting_o_event[o_index]["t"] in [23, 24] or starting_d_event[d_index]["t"] in [
-        23,
-        24,
-    ]:
-        return return_indices(None, o_index, d_index, possession, possession, True)
-
-    #     print(f"{o_index}, {d_index}, {starting_o_event[o_index]}, {starting_d_event[d_index]}")
-
-    # assign a default so that the linter stops yelling about current_d_event being unbounded
-    current_o_event: Dict = {}
-    current_o_index: int = 0
-    next_o_event: Dict = {}
-
-    current_d_event: Dict = {}
-    current_d_index: int = 0
-
-    if possession == "o":
-        current_o_event = starting_o_event[o_index]
-        current_o_index = int(o_index)
-        current_d_event = starting_d_event[d_index]
-        current_d_index = int(d_index)
-
-        # end of quarter?
-        if current_o_event["t"] in [25, 26] or current_d_event["t"] in [25, 26]:
-            action = None
-            return return_indices(
-                action, current_o_index, current_d_index, possession, possession, True
-            )
-
-        next_o_event = starting_o_event[o_index + 1]
-
-    elif possession == "d":
-        current_o_event = starting_d_event[d_index]
-        current_o_index = int(d_index)
-        current_d_event: Dict = starting_o_event[o_index]
-        current_d_index = int(o_index)
-
-        # end of quarter?
-        if current_o_event["t"] in [25, 26] or current_d_event["t"] in [25, 26]:
-            action = None
-            return return_indices(
-                action, current_o_index, current_d_index, possession, possession, True
-            )
+class PlayByPlayError(ValueError):
+    """Raised when a point's events can't be turned into a play by play
+
+    Keeps the state the parser was in so it can be inspected, without
+    putting the whole event stream into the message.
+    """
+
+    def __init__(
+        self,
+        point_index,
+        point,
+        starting_o_event,
+        starting_d_event,
+        o_index,
+        d_index,
+        possession,
+    ):
+        super().__init__(
+            f"Couldn't parse point {point_index}: possession: {possession}, "
+            f"o_index: {o_index}/{len(starting_o_event)}, d_index: {d_index}/{len(starting_d_event)}"
+        )
+        self.point_index = point_index
+        self.point = point
+        self.starting_o_event = starting_o_event
+        self.starting_d_event = starting_d_event
+        self.o_index = o_index
+        self.d_index = d_index
+        self.possession = possession
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (
+                self.point_index,
+                self.point,
+                self.starting_o_event,
+                self.starting_d_event,
+                self.o_index,
+                self.d_index,
+                self.possession,
+            ),
+        )
 
-        next_o_event = starting_d_event[current_o_index + 1]
 
-    else:
-        raise ValueError("possession must be one of ['o', 'd']")
+# event types that take part in the play by play, everything else is dropped up front
+PLAY_BY_PLAY_EVENT_TYPES = frozenset([3, 5, 8, 9, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26])
+POINT_OVER_EVENT_TYPES = frozenset([23, 24])
+END_OF_QUARTER_EVENT_TYPES = frozenset([25, 26])
+
+# What a throw (event 20) turns into, keyed on the thrower's team's next event.
+# Each entry is (turnover, throwaway, block, drop, goal, stall), whether the
+# receiver and receive position come from the next event, how far the offense
+# and defense streams advance, whether possession changes and whether the point
+# is over. A drop advances one further when it's followed by a bogus
+# throwaway (game 2021-07-02-SEA-AUS has one), a throw can't be both.
+COMPLETION_TRANSITION = ((False, False, False, False, False, False), True, True, 1, 0, False, False)
+BLOCK_TRANSITION = ((True, True, True, False, False, False), False, False, 2, 1, True, False)
+THROW_TRANSITIONS = {
+    8: ((True, True, False, False, False, False), False, True, 2, 1, True, False),
+    17: ((True, False, False, False, False, True), False, False, 2, 1, True, False),
+    19: ((True, False, False, True, False, False), True, True, 2, 1, True, False),
+    22: ((False, False, False, False, True, False), True, True, 0, 0, False, True),
+}
+
+
+def create_point_play_by_play(point, roster_id_map, point_index=None):
+    """The throws and pulls of a point, in order
+
+    Rather than mapping indices back and forth between the o and d streams on
+    every step, the stream that has the disc and the one that doesn't are
+    swapped on a turnover, and throws are resolved through
+    ``THROW_TRANSITIONS``.
+    """
+    pulling_team = get_pulling_team(point.home_point_event, point.away_point_event)
+    starting_o_event = (
+        point.away_point_event if pulling_team == "home" else point.home_point_event
+    )
+    starting_d_event = (
+        point.home_point_event if pulling_team == "home" else point.away_point_event
+    )
 
-    if current_d_event["t"] == 3:
-        player_id = current_d_event["r"] if "r" in current_d_event else None
-        puller = get_player_from_id(roster_id_map, player_id)
-        action = Pull(
-            puller, current_d_event["x"], current_d_event["y"], current_d_event["ms"]
-        )
+    starting_o_event = [
+        x for x in starting_o_event[1:] if x["t"] in PLAY_BY_PLAY_EVENT_TYPES
+    ]
+    starting_d_event = [
+        x for x in starting_d_event[1:] if x["t"] in PLAY_BY_PLAY_EVENT_TYPES
+    ]
 
-        current_d_index += 1
-        return return_indices(
-            action, current_o_index, current_d_index, possession, possession
-        )
+    def player(roster_id):
+        if roster_id is None or roster_id < 0:
+            return None
+        return roster_id_map[roster_id]
 
-    elif current_o_event["t"] == 20:
-        # check if there was a throwaway
-        if next_o_event["t"] == 8:
-            # check if it was a block
-            if current_d_event["t"] == 5:
-                action = Throw(
-                    get_player_from_id(roster_id_map, current_o_event["r"]),
-                    None,
-                    current_o_event["x"],
-                    current_o_event["y"],
-                    None,
-                    None,
-                    True,
-                    True,
-                    True,
-                    False,
-                    False,
-                    False,
+    point_actions = []
+    offense, defense = starting_o_event, starting_d_event
+    offense_index, defense_index = 0, 0
+    possession = "o"
+
+    try:
+        while offense_index < len(offense) and defense_index < len(defense):
+            current_o_event = offense[offense_index]
+            current_d_event = defense[defense_index]
+            o_type = current_o_event["t"]
+            d_type = current_d_event["t"]
+
+            if o_type in POINT_OVER_EVENT_TYPES or d_type in POINT_OVER_EVENT_TYPES:
+                break
+
+            # end of quarter?
+            if o_type in END_OF_QUARTER_EVENT_TYPES or d_type in END_OF_QUARTER_EVENT_TYPES:
+                break
+
+            next_o_event = offense[offense_index + 1]
+
+            if d_type == 3:
+                point_actions.append(
+                    Pull(
+                        player(current_d_event.get("r")),
+                        current_d_event["x"],
+                        current_d_event["y"],
+                        current_d_event["ms"],
+                    )
                 )
+                defense_index += 1
+                continue
 
-                current_o_index += 2
-                current_d_index += 1
-                return return_indices(
-                    action,
-                    current_o_index,
-                    current_d_index,
-                    possession,
-                    change_possession(possession),
+            if o_type != 20:
+                raise ValueError(
+                    f"Unbound event within possession: current_o_event: {current_o_event}, current_d_event: {current_d_event}"
                 )
-                
-            # it was a throwaway
+
+            next_type = next_o_event["t"]
+            if next_type == 8 and d_type == 5:
+                transition = BLOCK_TRANSITION
             else:
-                action = Throw(
-                    get_player_from_id(roster_id_map, current_o_event["r"]),
-                    None,
+                transition = THROW_TRANSITIONS.get(next_type, COMPLETION_TRANSITION)
+
+            (
+                flags,
+                has_receiver,
+                has_receive_position,
+                offense_advance,
+                defense_advance,
+                possession_changes,
+                point_over,
+            ) = transition
+
+            point_actions.append(
+                Throw(
+                    player(current_o_event["r"]),
+                    player(next_o_event["r"]) if has_receiver else None,
                     current_o_event["x"],
                     current_o_event["y"],
-                    next_o_event["x"],  # they log the x and y of the throwaway
-                    next_o_event["y"],
-                    True,
-                    True,
-                    False,
-                    False,
-                    False,
-                    False,
-                )
-
-                current_o_index += 2
-                current_d_index += 1
-                return return_indices(
-                    action,
-                    current_o_index,
-                    current_d_index,
-                    possession,
-                    change_possession(possession),
+                    next_o_event["x"] if has_receive_position else None,
+                    next_o_event["y"] if has_receive_position else None,
+                    *flags,
                 )
-            
-        # check if it was a stall
-        elif next_o_event["t"] == 17:
-            action = Throw(
-                get_player_from_id(roster_id_map, current_o_event["r"]),
-                None,
-                current_o_event["x"],
-                current_o_event["y"],
-                None,
-                None,
-                True,
-                False,
-                False,
-                False,
-                False,
-                True,
-            )
-
-            current_o_index += 2
-            current_d_index += 1
-            return return_indices(
-                action,
-                current_o_index,
-                current_d_index,
-                possession,
-                change_possession(possession),
-            )
-
-        # check if it was a drop
-        elif next_o_event["t"] == 19:
-            action = Throw(
-                get_player_from_id(roster_id_map, current_o_event["r"]),
-                get_player_from_id(roster_id_map, next_o_event["r"]),
-                current_o_event["x"],
-                current_o_event["y"],
-                next_o_event["x"],
-                next_o_event["y"],
-                True,
-                False,
-                False,
-                True,
-                False,
-                False,
-            )
-
-            # there was a case in game 2021-07-02-SEA-AUS where an 8 event followed a 19 event, 
-            # which can't happen. A throw cannot be both a drop and a throwaway. So we check for this, 
-            # and decide to skip that following 8 event.
-            whole_o_event = starting_o_event if possession == "o" else starting_d_event
-            if whole_o_event[current_o_index + 2]["t"] == 8:
-                current_o_index += 3
-            else:
-                current_o_index += 2
-            
-            current_d_index += 1
-            return return_indices(
-                action,
-                current_o_index,
-                current_d_index,
-                possession,
-                change_possession(possession),
-            )
-
-        # check if it was a goal
-        elif next_o_event["t"] == 22:
-            action = Throw(
-                get_player_from_id(roster_id_map, current_o_event["r"]),
-                get_player_from_id(roster_id_map, next_o_event["r"]),
-                current_o_event["x"],
-                current_o_event["y"],
-                next_o_event["x"],
-                next_o_event["y"],
-                False,
-                False,
-                False,
-                False,
-                True,
-                False,
-            )
-
-            # don't worry about changing indices since the point is over
-            return return_indices(
-                action, current_o_index, current_d_index, possession, possession, True
-            )
-
-        else:
-            action = Throw(
-                get_player_from_id(roster_id_map, current_o_event["r"]),
-                get_player_from_id(roster_id_map, next_o_event["r"]),
-                current_o_event["x"],
-                current_o_event["y"],
-                next_o_event["x"],
-                next_o_event["y"],
-                False,
-                False,
-                False,
-                False,
-                False,
-                False,
             )
 
-            current_o_index += 1
-
-            return return_indices(
-                action, current_o_index, current_d_index, possession, possession
-            )
+            if point_over:
+                break
 
-    else:
-        raise ValueError(
-            f"Unbound event within possession: possession: {possession}, o_index: {o_index}, d_index: {d_index}, current_o_event: {current_o_event}, current_d_event: {current_d_event}, starting_o_event: {starting_o_event}, starting_d_event: {starting_d_event}")
+            if next_type == 19 and offense[offense_index + 2]["t"] == 8:
+                offense_advance += 1
 
+            offense_index += offense_advance
+            defense_index += defense_advance
+            if possession_changes:
+                offense, defense = defense, offense
+                offense_index, defense_index = defense_index, offense_index
+                possession = change_possession(possession)
 
-def create_play_by_play(all_points, roster_id_map):
-    numbers_care_about = [3, 5, 8, 9, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26]
-
-    play_by_play = []
-    for i, point in enumerate(all_points):
-        point_actions = []
-        new_o_index = 0
-        new_d_index = 0
-        possession = "o"
-        point_over = False
-
-        pulling_team = get_pulling_team(point.home_point_event, point.away_point_event)
-        starting_o_event = (
-            point.away_point_event if pulling_team == "home" else point.home_point_event
+    except Exception as e:
+        o_index, d_index = (
+            (offense_index, defense_index) if possession == "o" else (defense_index, offense_index)
         )
-        starting_d_event = (
-            point.home_point_event if pulling_team == "home" else point.away_point_event
-        )
-
-        starting_o_event = [
-            x for x in starting_o_event[1:] if x["t"] in numbers_care_about
-        ]
-        starting_d_event = [
-            x for x in starting_d_event[1:] if x["t"] in numbers_care_about
-        ]
+        raise PlayByPlayError(
+            point_index,
+            point,
+            starting_o_event,
+            starting_d_event,
+            o_index,
+            d_index,
+            possession,
+        ) from e
 
-        while not point_over:
-            try:
-                action, new_o_index, new_d_index, possession, point_over = handle_next_step(
-                    roster_id_map,
-                    starting_o_event,
-                    starting_d_event,
-                    new_o_index,
-                    new_d_index,
-                    possession,
-                )
+    return point_actions
 
-            except Exception as e:
-                print(f"Point: {all_points[i]}")
-                print(f"Home events: {all_points[i].home_point_event}")
-                print(f"Away events: {all_points[i].away_point_event}")
-                print(f"starting_o_event: {starting_o_event}")
-                print(f"starting_d_event: {starting_d_event}")
-                print(f"new_o_index: {new_o_index}")
-                print(f"new_d_index: {new_d_index}")
-                print(f"possession: {possession}")
-                raise e
 
-            if action is not None:
-                point_actions.append(action)
-
-        play_by_play.append(point_actions)
-
-    return play_by_play
+@tracing.traced("create_play_by_play")
+def create_play_by_play(all_points, roster_id_map):
+    return [
+        create_point_play_by_play(point, roster_id_map, i)
+        for i, point in enumerate(all_points)
+    ]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Possession:
     point: int
     index: int
@@ -559,78 +573,86 @@ class Possession:
     play_by_play: List
 
 
-def create_possessions(points):
+def create_point_possessions(point_index, point):
     possessions = []
-    for point_index, point in enumerate(points):
-        pulling_team = get_pulling_team(point.home_point_event, point.away_point_event)
-        receiving_team = get_receiving_team(
-            point.home_point_event, point.away_point_event
-        )
-        possession = "o"
-        pulling_players = (
-            point.home_players if pulling_team == "home" else point.away_players
-        )
-        receiving_players = (
-            point.home_players if pulling_team == "away" else point.away_players
-        )
+    pulling_team = get_pulling_team(point.home_point_event, point.away_point_event)
+    receiving_team = get_receiving_team(
+        point.home_point_event, point.away_point_event
+    )
+    possession = "o"
+    pulling_players = (
+        point.home_players if pulling_team == "home" else point.away_players
+    )
+    receiving_players = (
+        point.home_players if pulling_team == "away" else point.away_players
+    )
 
-        plays = [x for x in point.play_by_play]
+    plays = [x for x in point.play_by_play]
 
-        # check to see how many pulls are in a point
-        num_pulls = len([play for play in plays if isinstance(play, Pull)])
-        if num_pulls > 1:
-            # make sure that all pulls are in the front. If we convert it to a binary representation of 0 and 1,
-            # then we should expect the series to look like 1, 1, 0, 0, 0
-            # if it looks like 1, 0, 1, 0, 0, then that's bad. 
-            # we check to see if any of the running diffs is greater than 0 (i+1 - i)
-            is_pull_array = [int(isinstance(play, Pull)) for play in plays]
-            diffs = [y - x for (x, y) in zip(is_pull_array, is_pull_array[1:])]
-            if len([x for x in diffs if x > 0]) > 0:
-                raise ValueError(f"Point has pulls that are not all at front. point_index: {point_index}")
+    # check to see how many pulls are in a point
+    num_pulls = len([play for play in plays if isinstance(play, Pull)])
+    if num_pulls > 1:
+        # make sure that all pulls are in the front. If we convert it to a binary representation of 0 and 1,
+        # then we should expect the series to look like 1, 1, 0, 0, 0
+        # if it looks like 1, 0, 1, 0, 0, then that's bad. 
+        # we check to see if any of the running diffs is greater than 0 (i+1 - i)
+        is_pull_array = [int(isinstance(play, Pull)) for play in plays]
+        diffs = [y - x for (x, y) in zip(is_pull_array, is_pull_array[1:])]
+        if len([x for x in diffs if x > 0]) > 0:
+            raise ValueError(f"Point has pulls that are not all at front. point_index: {point_index}")
 
 
-        elif num_pulls == 1:
-            if not isinstance(plays[0], Pull):
-                raise ValueError(f"There is a pull this point, but it's not the first play. point_index: {point_index}")
+    elif num_pulls == 1:
+        if not isinstance(plays[0], Pull):
+            raise ValueError(f"There is a pull this point, but it's not the first play. point_index: {point_index}")
 
-        else:
-            pass
-
-        # get rid of all of the pulls. There will not be a 
-        # pull in cases where offsides happen and the other team gets
-        # the disc at the brick
-        plays = [play for play in plays if not isinstance(play, Pull)]
-
-        current_o_index = 0
-        current_d_index = -1
-        possession_start_index = 0
-        for throw_index, throw in enumerate(plays):
-            if throw.turnover or throw.goal or throw_index == (len(plays) - 1):
-                possessions.append(
-                    Possession(
-                        point_index,
-                        current_o_index if possession == "o" else current_d_index,
-                        receiving_team if possession == "o" else pulling_team,
-                        possession == "d",
-                        receiving_players if possession == "o" else pulling_players,
-                        throw.turnover,
-                        throw.throwaway,
-                        throw.block,
-                        throw.drop,
-                        throw.goal,
-                        True if throw_index == (len(plays) - 1) else False,
-                        [x for x in plays[possession_start_index: (throw_index + 1)]],
-                    )
+    else:
+        pass
+
+    # get rid of all of the pulls. There will not be a 
+    # pull in cases where offsides happen and the other team gets
+    # the disc at the brick
+    plays = [play for play in plays if not isinstance(play, Pull)]
+
+    current_o_index = 0
+    current_d_index = -1
+    possession_start_index = 0
+    for throw_index, throw in enumerate(plays):
+        if throw.turnover or throw.goal or throw_index == (len(plays) - 1):
+            possessions.append(
+                Possession(
+                    point_index,
+                    current_o_index if possession == "o" else current_d_index,
+                    receiving_team if possession == "o" else pulling_team,
+                    possession == "d",
+                    receiving_players if possession == "o" else pulling_players,
+                    throw.turnover,
+                    throw.throwaway,
+                    throw.block,
+                    throw.drop,
+                    throw.goal,
+                    True if throw_index == (len(plays) - 1) else False,
+                    plays[possession_start_index: (throw_index + 1)],
                 )
+            )
 
-                if throw.turnover:
-                    if possession == "o":
-                        current_d_index += 1
-                    else:
-                        current_o_index += 1
+            if throw.turnover:
+                if possession == "o":
+                    current_d_index += 1
+                else:
+                    current_o_index += 1
 
-                    possession = change_possession(possession)
-                    possession_start_index = throw_index + 1
+                possession = change_possession(possession)
+                possession_start_index = throw_index + 1
+
+    return possessions
+
+
+@tracing.traced("create_possessions")
+def create_possessions(points):
+    possessions = []
+    for point_index, point in enumerate(points):
+        possessions.extend(create_point_possessions(point_index, point))
 
     return possessions
 
@@ -641,6 +663,13 @@ class ParsedEvent:
     points: List[Point]
     possessions: List[Possession]
 
+    def to_frame(self, game_id=""):
+        """One row per throw, see ``audldb.frames.throws_frame``"""
+        # frames builds on this module, so import it when it's needed
+        from .frames import throws_frame
+
+        return throws_frame(self, game_id)
+
 
 def filter_empty_points(points):
     """Filter out points where there is not an entry with a roster"""
@@ -653,9 +682,22 @@ def filter_empty_points(points):
     return filtered_points
 
 
-def parse_events(game_info):
-    home_events = json.loads(game_info["tsgHome"]["events"])
-    away_events = json.loads(game_info["tsgAway"]["events"])
+def split_points(home_events, away_events, use_columnar=False):
+    """Pair up the home and away events of each point, along with each side's stats
+
+    With ``use_columnar`` the point boundaries and counters are computed on numpy
+    arrays (see ``audldb.columnar``), otherwise the stats are left as ``None``
+    for ``Point`` to count.
+    """
+    if use_columnar:
+        home_columns = columnar.decode_events(home_events)
+        away_columns = columnar.decode_events(away_events)
+        return zip(
+            home_columns.point_events(),
+            away_columns.point_events(),
+            home_columns.point_stats(),
+            away_columns.point_stats(),
+        )
 
     away_point_events = events_per_point(away_events)
     home_point_events = events_per_point(home_events)
@@ -663,20 +705,250 @@ def parse_events(game_info):
     away_point_events = filter_empty_points(away_point_events)
     home_point_events = filter_empty_points(home_point_events)
 
-    roster_id_map = get_roster_id_map(game_info)
-
-    all_points = [
-        Point(home_point_event, away_point_event, roster_id_map)
+    return (
+        (home_point_event, away_point_event, None, None)
         for home_point_event, away_point_event in zip(
             home_point_events, away_point_events
         )
-    ]
-
-    play_by_play = create_play_by_play(all_points, roster_id_map)
+    )
 
-    for point, play_by_play_point in zip(all_points, play_by_play):
-        point.play_by_play = play_by_play_point
 
-    all_possessions = create_possessions(all_points)
+def iter_parse_events(game_info, use_columnar=False, roster_id_map=None):
+    """Parse a game lazily, yielding each ``Point`` followed by its ``Possession``s
+
+    Nothing is held on to between points, so the first possessions are
+    available before the rest of the game is parsed. Pass ``roster_id_map`` to
+    reuse one built with ``get_roster_id_map``.
+    """
+    with tracing.stage("decode_events"):
+        home_events = json.loads(game_info["tsgHome"]["events"])
+        away_events = json.loads(game_info["tsgAway"]["events"])
+
+    if roster_id_map is None:
+        roster_id_map = get_roster_id_map(game_info)
+
+    with tracing.stage("events_per_point"):
+        points = split_points(home_events, away_events, use_columnar)
+
+    # the points are handed out one at a time, so each stage's time is
+    # summed over the game and recorded once it's been parsed, or once the
+    # caller stops asking for more
+    play_by_play_span = tracing.span("create_play_by_play")
+    possessions_span = tracing.span("create_possessions")
+    try:
+        for point_index, (home_point_event, away_point_event, home_stats, away_stats) in enumerate(points):
+            point = Point(home_point_event, away_point_event, roster_id_map, home_stats, away_stats)
+            with play_by_play_span:
+                point.play_by_play = create_point_play_by_play(point, roster_id_map, point_index)
+            yield point
+
+            with possessions_span:
+                possessions = create_point_possessions(point_index, point)
+            yield from possessions
+    finally:
+        play_by_play_span.record()
+        possessions_span.record()
+
+
+def parse_events(game_info, use_columnar=False, registry=None):
+    roster_id_map = get_roster_id_map(game_info, registry)
+
+    all_points = []
+    all_possessions = []
+    for parsed in iter_parse_events(game_info, use_columnar, roster_id_map):
+        if isinstance(parsed, Point):
+            all_points.append(parsed)
+        else:
+            all_possessions.append(parsed)
 
     return roster_id_map, all_points, all_possessions
+
+
+_json_decoder = json.JSONDecoder()
+
+
+def _prefix_digest(text, end) -> str:
+    return hashlib.sha256(text[:end].encode("utf-8")).hexdigest()
+
+
+def decode_new_events(text, end=None, digest=""):
+    """Decode the events appended to a JSON array since it was last decoded up to ``end``
+
+    ``end`` is the offset of the array's closing bracket last time and
+    ``digest`` the sha256 of everything before it, which has to be unchanged
+    for the new text to be an extension of the old one (a stat correction
+    to an earlier event isn't). Returns the new events and the ``end`` and
+    ``digest`` to pass next time, or ``None`` when the text doesn't extend
+    the old one.
+    """
+    if end is None:
+        events = json.loads(text)
+        end = len(text.rstrip()) - 1
+        return events, end, _prefix_digest(text, end)
+
+    if len(text) <= end or _prefix_digest(text, end) != digest:
+        return None
+
+    events = []
+    position = end
+    try:
+        while True:
+            while text[position] in " \t\n\r,":
+                position += 1
+            if text[position] == "]":
+                break
+            event, position = _json_decoder.raw_decode(text, position)
+            events.append(event)
+    except (IndexError, ValueError):
+        return None
+
+    return events, position, _prefix_digest(text, position)
+
+
+class IncrementalParse(object):
+    """Parse of a game in progress that's brought up to date a payload at a time
+
+    Each ``update`` decodes only the events added to the payload since the
+    last one, throws away the last point (it may not have been over) and
+    parses it again along with any new points, so the cost of an update
+    depends on how much happened since, not on how long the game is. Gives
+    the same points and possessions as ``parse_events`` on the same payload,
+    except that a last point that can't be parsed yet (it usually stops
+    part way through a throw) is left out until more of it comes in, rather
+    than raising. A payload that doesn't extend the last one is parsed from
+    scratch.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        self.roster_id_map: Dict = {}
+        self.points: List[Point] = []
+        self.possessions: List[Possession] = []
+        # held by callers sharing a parse between threads, around update and parsed_event
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._roster_sizes = None
+        self.points = []
+        self.possessions = []
+        # per team: offset and digest of the decoded events (see
+        # decode_new_events) and the events from the start of the last point
+        # on, and the index of that point
+        self._home = (None, "", [])
+        self._away = (None, "", [])
+        self._last_point_index = 0
+
+    def parsed_event(self) -> "ParsedEvent":
+        return ParsedEvent(self.roster_id_map, list(self.points), list(self.possessions))
+
+    def update(self, game_info) -> Tuple[List[Point], List[Possession]]:
+        """Bring the parse up to ``game_info``, returns the points and possessions parsed again or for the first time"""
+        with tracing.stage("decode_events"):
+            home = decode_new_events(game_info["tsgHome"]["events"], *self._home[:2])
+            away = decode_new_events(game_info["tsgAway"]["events"], *self._away[:2])
+        if home is None or away is None:
+            self._reset()
+            return self.update(game_info)
+
+        # players can be added to a roster during a game
+        roster_sizes = (len(game_info["rostersHome"]), len(game_info["rostersAway"]))
+        if roster_sizes != self._roster_sizes:
+            self.roster_id_map = get_roster_id_map(game_info, self.registry)
+            self._roster_sizes = roster_sizes
+
+        home_new, home_end, home_digest = home
+        away_new, away_end, away_digest = away
+        if len(home_new) == 0 and len(away_new) == 0:
+            return [], []
+
+        with tracing.stage("events_per_point"):
+            home_points = filter_empty_points(events_per_point(self._home[2] + home_new))
+            away_points = filter_empty_points(events_per_point(self._away[2] + away_new))
+
+        # the last point is parsed again, so start over from its index
+        first_point_index = self._last_point_index
+        num_points = min(len(home_points), len(away_points))
+        points = []
+        possessions = []
+        for point_index, (home_point_event, away_point_event) in enumerate(
+            zip(home_points, away_points), first_point_index
+        ):
+            point = Point(home_point_event, away_point_event, self.roster_id_map)
+            try:
+                point.play_by_play = create_point_play_by_play(point, self.roster_id_map, point_index)
+            except PlayByPlayError:
+                if point_index < first_point_index + num_points - 1:
+                    raise
+                break
+
+            points.append(point)
+            possessions.extend(create_point_possessions(point_index, point))
+
+        # nothing is changed until the new points have parsed
+        del self.points[first_point_index:]
+        while len(self.possessions) > 0 and self.possessions[-1].point >= first_point_index:
+            self.possessions.pop()
+        self.points.extend(points)
+        self.possessions.extend(possessions)
+
+        # keep each team's events from the last point on both sides on
+        last = max(num_points - 1, 0)
+        self._home = (home_end, home_digest, [x for point in home_points[last:] for x in point])
+        self._away = (away_end, away_digest, [x for point in away_points[last:] for x in point])
+        self._last_point_index = first_point_index + last
+
+        return points, possessions
+
+
+@lru_cache()
+def default_parsed_cache() -> cache.ParsedGameCache:
+    return cache.ParsedGameCache(PARSER_VERSION)
+
+
+# games still being played, by game id, brought up to date on every fetch. Least
+# recently fetched first, so games that never finish (postponed, abandoned) fall out
+MAX_LIVE_GAMES = 32
+_live_games: "OrderedDict[str, IncrementalParse]" = OrderedDict()
+_live_games_lock = threading.Lock()
+
+
+def get_parsed_game(url, game_cache=None, parsed_cache=None) -> ParsedEvent:
+    """Fetch and parse a game, reusing an earlier parse of the same payload
+
+    Games that aren't over are parsed incrementally instead of going through
+    the parsed game cache, see ``IncrementalParse``.
+    """
+    if game_cache is None:
+        game_cache = cache.default_cache()
+    if parsed_cache is None:
+        parsed_cache = default_parsed_cache()
+
+    with tracing.stage("fetch"):
+        entry = game_cache.fetch(url)
+
+    parsed = parsed_cache.get(entry.digest)
+    if parsed is not None:
+        return parsed
+
+    with tracing.stage("decode_payload"):
+        game_info = json.loads(entry.content)
+
+    if not cache.game_is_final(game_info):
+        # the global lock is only for finding the game's parse, every game updates under its own
+        with _live_games_lock:
+            live = _live_games.pop(entry.game_id, None) or IncrementalParse()
+            _live_games[entry.game_id] = live
+            while len(_live_games) > MAX_LIVE_GAMES:
+                _live_games.popitem(last=False)
+
+        with live.lock:
+            live.update(game_info)
+            return live.parsed_event()
+
+    with _live_games_lock:
+        _live_games.pop(entry.game_id, None)
+
+    parsed = ParsedEvent(*parse_events(game_info, use_columnar=True))
+    parsed_cache.put(entry.digest, parsed)
+    return parsed
@@ -1,9 +1,9 @@
 from ast import parse
-from audldb import common, game, get_audl_stats, munging
+from audldb import catalog, common, game, munging, tracing
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc
-from dash import html, callback
+from dash import html, callback, clientside_callback
 import numpy as np
 import os
 import pandas as pd
@@ -11,12 +11,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 import posixpath
 
-from functools import lru_cache
-
 from dataclasses import dataclass
 
 
-from dash.dependencies import Input, Output
+from dash.dependencies import ClientsideFunction, Input, Output, State
 from plotly.subplots import make_subplots
 
 dash.register_page(__name__, path="/home")
@@ -28,79 +26,93 @@ class DataHolder:
 
 game_info = DataHolder(munging.ParsedEvent({}, [], []))
 
+# draw possessions in the browser from a store filled once per game, instead of
+# asking the server for every slider position
+CLIENTSIDE_PLOT = common.clientside_plot()
+
 
 # fig_loss_rates = generate_line_graph(data_table.data)
 fig_field_plot = game.plot_field()
 
 
-@lru_cache()
-def get_game_urls():
-    return list(sorted(get_audl_stats.get_audl_stat_urls()))
+# the game list comes from the catalog snapshot on disk, so loading the page never waits
+# on the network. The schedules are refreshed in the background (by one worker at a time)
+# and the dropdown picks up new games through the interval below once that finishes
+game_catalog = catalog.BackgroundCatalog()
 
 
-all_game_urls = get_game_urls()
+def get_game_options():
+    return [
+        {'label': posixpath.split(url)[-1], 'value': url}
+        for url in game_catalog.urls()
+    ]
 
-body = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.Div([
-                dcc.Dropdown(
-                    id='demo-dropdown',
-                    options=[
-                        {'label': posixpath.split(url)[-1], 'value': url}
-                        for url in all_game_urls
-                    ],
-                    value=None
-                )
-            ]),
-        ])
-    ]),
-    dbc.Row([
-        dbc.Col([
-            html.H2("Home"),
-            html.Div(
-                id='live-update-text',
-            )
-            # html.Button("Refresh Data", id="home-main-data-table-refresh"),
-        ])
-    ]),
-    dcc.Loading(
-        id="home-main-loading",
-        type="default",
-        children=[
-            dbc.Row([
-                dbc.Col([
-                    dcc.Graph(
-                        id="fig-field-plot",
-                        figure=fig_field_plot
+
+def body():
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    dcc.Dropdown(
+                        id='demo-dropdown',
+                        options=get_game_options(),
+                        value=None
+                    ),
+                    dcc.Interval(
+                        id='home-game-list-refresh',
+                        interval=2000,
                     ),
-                    html.Div(
-                        id="fig-slider-index",
-                        children=[
-                            dcc.Slider(
-                                id='fig-slider',
-                                min=-1,
-                                max=0.0,
-                                step=1.0,
-                                value=-1,
-                                # marks={0: '0', 180: '180', 360: '360'},
-                                updatemode='drag',
-                            ),
-                        ],
-                        # style=dict(width='50%'),
-                    )
                 ]),
             ])
-        ]
-    )
-])
+        ]),
+        dbc.Row([
+            dbc.Col([
+                html.H2("Home"),
+                html.Div(
+                    id='live-update-text',
+                )
+                # html.Button("Refresh Data", id="home-main-data-table-refresh"),
+            ])
+        ]),
+        dcc.Loading(
+            id="home-main-loading",
+            type="default",
+            children=[
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(
+                            id="fig-field-plot",
+                            figure=fig_field_plot
+                        ),
+                        dcc.Store(id="home-game-possessions"),
+                        html.Div(
+                            id="fig-slider-index",
+                            children=[
+                                dcc.Slider(
+                                    id='fig-slider',
+                                    min=-1,
+                                    max=0.0,
+                                    step=1.0,
+                                    value=-1,
+                                    # marks={0: '0', 180: '180', 360: '360'},
+                                    updatemode='drag',
+                                ),
+                            ],
+                            # style=dict(width='50%'),
+                        )
+                    ]),
+                ])
+            ]
+        )
+    ])
 
 
 def layout():
     # load_data(data_table, cache_dir, home_queries.data_query)
+    game_catalog.refresh()
     return html.Div([
         navbar(),
-        body
+        body()
     ])
 
 
@@ -143,11 +155,21 @@ def navbar():
 
     return default
 
+@callback(
+    Output('demo-dropdown', 'options'),
+    Output('home-game-list-refresh', 'disabled'),
+    Input('home-game-list-refresh', 'n_intervals')
+)
+def update_game_options(n_intervals):
+    return get_game_options(), not game_catalog.refreshing
+
+
 @callback(
         # Output("home-game-info", "data"),
         # Output("fig-field-plot", "figure"),
     Output(component_id='live-update-text', component_property='children'),
     Output(component_id='fig-slider-index', component_property='children'),
+    Output("home-game-possessions", "data"),
     Input('demo-dropdown', 'value')
 )
 def update_game_data(value):
@@ -161,14 +183,16 @@ def update_game_data(value):
                 step=1.0,
                 value=-1,
                 updatemode='drag',
-            )
+            ),
+            None,
         ]
 
     else:
         print(f"Getting game data for url: {value}")
-        parsed_event = munging.parse_events(munging.get_data(value))
-        
-        game_info.data = munging.ParsedEvent(*parsed_event)
+        with tracing.stage("load_game"):
+            game_info.data = munging.get_parsed_game(value)
+        possession_columns = game.possession_columns(game_info.data.possessions) if CLIENTSIDE_PLOT else None
+        tracing.log_summary()
 
         return [html.Span(f"Game is {value}"), html.Span(f"Num possessions is {len(game_info.data.possessions)}")], dcc.Slider(
                 id='fig-slider',
@@ -178,22 +202,30 @@ def update_game_data(value):
                 value=1,
                 marks={1: '1', len(game_info.data.possessions): str(len(game_info.data.possessions))},
                 updatemode='drag',
-            )
+            ), possession_columns
         
 
 
-@callback(
-    Output("fig-field-plot", "figure"),
-    Input('fig-slider', 'value')
-)
 def update_possession_plot(value):
     if value == -1:  # happens when first loading
         return fig_field_plot
 
     else:
 
-        fig = game.plot_field()
-        fig = game.plot_possession(fig, game_info.data.possessions[value - 1])
+        # the field is already on the graph, only send what changes
+        return game.possession_patch(game_info.data.possessions[value - 1])
 
-        return fig
 
+if CLIENTSIDE_PLOT:
+    clientside_callback(
+        ClientsideFunction(namespace="audldb", function_name="possessionFigure"),
+        Output("fig-field-plot", "figure"),
+        Input('fig-slider', 'value'),
+        State("home-game-possessions", "data"),
+        State("fig-field-plot", "figure"),
+    )
+else:
+    callback(
+        Output("fig-field-plot", "figure"),
+        Input('fig-slider', 'value')
+    )(update_possession_plot)
@@ -0,0 +1,247 @@
+"""
+Look up throws and possessions of parsed games without going through them one by one.
+
+``PossessionIndex`` keeps inverted indexes from players, outcomes and parts of
+the field to the throws and possessions they apply to, so a query is a few set
+intersections:
+
+    index = PossessionIndex()
+    for game_id, parsed in games:
+        index.add_game(game_id, parsed)
+    index.turnovers(player_id, zone="attacking")
+"""
+
+import heapq
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import munging
+
+FIELD_WIDTH = 53.33
+
+# left to right, split where plot_field(include_thirds=True) draws its lines
+THIRDS = ("left", "middle", "right")
+# along the field in the direction of attack, between the end zones (plot y 10 to 90)
+ZONES = ("own", "middle", "attacking")
+
+THROW_OUTCOMES = ("completion", "goal", "throwaway", "block", "drop", "stall")
+POSSESSION_OUTCOMES = ("goal", "throwaway", "block", "drop", "stall", "end_of_quarter")
+# a drop is on the receiver, every other turnover on the thrower
+THROWER_TURNOVERS = ("throwaway", "block", "stall")
+
+
+def third_of(x) -> str:
+    plot_x = x + FIELD_WIDTH / 2
+    if plot_x < FIELD_WIDTH / 3:
+        return "left"
+    elif plot_x < FIELD_WIDTH / 3 * 2:
+        return "middle"
+    return "right"
+
+
+def zone_of(y) -> str:
+    plot_y = y - 10
+    if plot_y < 10 + 80 / 3:
+        return "own"
+    elif plot_y < 10 + 80 / 3 * 2:
+        return "middle"
+    return "attacking"
+
+
+def throw_outcome(throw) -> str:
+    if throw.goal:
+        return "goal"
+    elif throw.block:
+        return "block"
+    elif throw.drop:
+        return "drop"
+    elif throw.stall:
+        return "stall"
+    elif throw.throwaway:
+        return "throwaway"
+    return "completion"
+
+
+def possession_outcome(possession) -> str:
+    last_throw = possession.play_by_play[-1] if len(possession.play_by_play) > 0 else None
+    if last_throw is not None and (last_throw.turnover or last_throw.goal):
+        return throw_outcome(last_throw)
+    return "end_of_quarter"
+
+
+class PossessionIndex(object):
+    """Inverted indexes over the throws and possessions of any number of games
+
+    Throws and possessions are numbered as they're added, reusing the numbers
+    of removed games (lowest first) before new ones, and every index maps a
+    key to the set of numbers it applies to:
+
+    * ``thrower``/``receiver``: ``player_id`` to throws
+    * ``throw_outcome``: one of ``THROW_OUTCOMES`` to throws
+    * ``third``/``zone``: where a throw was thrown from, see ``THIRDS`` and ``ZONES``
+    * ``player``: ``player_id`` to the possessions they threw or caught in
+    * ``possession_outcome``: one of ``POSSESSION_OUTCOMES`` to possessions
+    * ``game``: game id to possessions
+    """
+
+    THROW_INDEXES = ("thrower", "receiver", "throw_outcome", "third", "zone")
+    POSSESSION_INDEXES = ("player", "possession_outcome", "game")
+
+    def __init__(self):
+        self.throws: List[Optional[munging.Throw]] = []
+        self.possessions: List[Optional[Tuple[str, munging.Possession]]] = []
+        self.throw_possession: List[int] = []
+        self.indexes: Dict[str, Dict[object, Set[int]]] = {
+            name: defaultdict(set) for name in self.THROW_INDEXES + self.POSSESSION_INDEXES
+        }
+        self._game_ids: Dict[str, Tuple[List[int], List[int]]] = {}
+        # heaps of the numbers removed games left behind
+        self._free_possessions: List[int] = []
+        self._free_throws: List[int] = []
+
+    def __len__(self):
+        return len(self._game_ids)
+
+    def __contains__(self, game_id):
+        return game_id in self._game_ids
+
+    @staticmethod
+    def _throw_keys(throw):
+        if throw.thrower is not None:
+            yield "thrower", throw.thrower.player_id
+        if throw.receiver is not None:
+            yield "receiver", throw.receiver.player_id
+        yield "throw_outcome", throw_outcome(throw)
+        yield "third", third_of(throw.throw_position_x)
+        yield "zone", zone_of(throw.throw_position_y)
+
+    @staticmethod
+    def _possession_keys(game_id, possession):
+        yield "game", game_id
+        yield "possession_outcome", possession_outcome(possession)
+        for throw in possession.play_by_play:
+            for player in [throw.thrower, throw.receiver]:
+                if player is not None:
+                    yield "player", player.player_id
+
+    @staticmethod
+    def _take(rows, free, row) -> int:
+        if free:
+            number = heapq.heappop(free)
+            rows[number] = row
+        else:
+            number = len(rows)
+            rows.append(row)
+        return number
+
+    def add_game(self, game_id, parsed_event: munging.ParsedEvent):
+        """Index a game's possessions and throws, replacing it if it's already indexed"""
+        self.remove_game(game_id)
+
+        indexes = self.indexes
+        possession_numbers, throw_numbers = [], []
+        for possession in parsed_event.possessions:
+            possession_number = self._take(
+                self.possessions, self._free_possessions, (game_id, possession)
+            )
+            possession_numbers.append(possession_number)
+            for name, key in self._possession_keys(game_id, possession):
+                indexes[name][key].add(possession_number)
+
+            for throw in possession.play_by_play:
+                throw_number = self._take(self.throws, self._free_throws, throw)
+                if throw_number < len(self.throw_possession):
+                    self.throw_possession[throw_number] = possession_number
+                else:
+                    self.throw_possession.append(possession_number)
+                throw_numbers.append(throw_number)
+                for name, key in self._throw_keys(throw):
+                    indexes[name][key].add(throw_number)
+
+        self._game_ids[game_id] = (possession_numbers, throw_numbers)
+
+    def remove_game(self, game_id):
+        numbers = self._game_ids.pop(game_id, None)
+        if numbers is None:
+            return
+
+        possession_numbers, throw_numbers = numbers
+        for possession_number in possession_numbers:
+            for name, key in self._possession_keys(*self.possessions[possession_number]):
+                self.indexes[name][key].discard(possession_number)
+            self.possessions[possession_number] = None
+            heapq.heappush(self._free_possessions, possession_number)
+
+        for throw_number in throw_numbers:
+            for name, key in self._throw_keys(self.throws[throw_number]):
+                self.indexes[name][key].discard(throw_number)
+            self.throws[throw_number] = None
+            heapq.heappush(self._free_throws, throw_number)
+
+    def _match(self, **criteria) -> Set[int]:
+        """Numbers matching every ``index=key`` (or ``index=[keys]``, any of them) given"""
+        alternatives = []
+        for name, keys in criteria.items():
+            if keys is None:
+                continue
+            if not isinstance(keys, (list, tuple, set, frozenset)):
+                keys = [keys]
+            index = self.indexes[name]
+            alternatives.append([index[x] for x in keys if x in index])
+
+        if len(alternatives) == 0:
+            raise ValueError("Give at least one thing to look up")
+
+        # start from the smallest criterion, every intersection after that
+        # only costs as much as what's left
+        alternatives.sort(key=lambda sets: sum(len(x) for x in sets))
+        matched = set().union(*alternatives[0])
+        for sets in alternatives[1:]:
+            if not matched:
+                break
+            matched = set().union(*(matched & x for x in sets))
+        return matched
+
+    def throw_numbers(
+        self,
+        thrower=None,
+        receiver=None,
+        outcome=None,
+        third=None,
+        zone=None,
+    ) -> List[int]:
+        return sorted(
+            self._match(
+                thrower=thrower,
+                receiver=receiver,
+                throw_outcome=outcome,
+                third=third,
+                zone=zone,
+            )
+        )
+
+    def find_throws(self, **criteria) -> List[munging.Throw]:
+        """Throws matching all of ``thrower``, ``receiver``, ``outcome``, ``third`` and ``zone`` given"""
+        return [self.throws[x] for x in self.throw_numbers(**criteria)]
+
+    def find_possessions(self, player=None, outcome=None, game=None) -> List[Tuple[str, munging.Possession]]:
+        """``(game_id, possession)`` pairs matching all of ``player``, ``outcome`` and ``game`` given"""
+        numbers = self._match(player=player, possession_outcome=outcome, game=game)
+        return [self.possessions[x] for x in sorted(numbers)]
+
+    def turnovers(self, player_id, third=None, zone=None) -> List[munging.Throw]:
+        """Throws that a player turned over, as the thrower or by dropping them"""
+        numbers = self._match(thrower=player_id, throw_outcome=THROWER_TURNOVERS, third=third, zone=zone)
+        numbers |= self._match(receiver=player_id, throw_outcome="drop", third=third, zone=zone)
+        return [self.throws[x] for x in sorted(numbers)]
+
+    def possession_of(self, throw_number) -> Tuple[str, munging.Possession]:
+        return self.possessions[self.throw_possession[throw_number]]
+
+
+def build_index(games: Iterable[Tuple[str, munging.ParsedEvent]]) -> PossessionIndex:
+    index = PossessionIndex()
+    for game_id, parsed_event in games:
+        index.add_game(game_id, parsed_event)
+    return index
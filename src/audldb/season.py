@@ -0,0 +1,280 @@
+"""
+Season totals per player and per team, kept up to date a game at a time.
+
+Every game's contribution is stored alongside the totals, so adding a game
+that's already in there (say it was ingested again after a stat correction)
+swaps its old numbers for the new ones instead of counting it twice.
+
+    python -m audldb.season games.jsonl.gz --leaderboard goals
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from . import common, ingest, munging
+
+logger = logging.getLogger(__name__)
+
+SEASON_STATS_VERSION = 2
+
+PLAYER_STATS = [
+    "games",
+    "points_played",
+    "possessions",
+    "completions",
+    "throwaways",
+    "drops",
+    "blocks",
+    "goals",
+    "assists",
+]
+TEAM_STATS = [
+    "games",
+    "points_played",
+    "possessions",
+    "completions",
+    "throwaways",
+    "drops",
+    "blocks",
+    "goals",
+]
+
+
+@dataclass
+class GameStats:
+    """What one game adds to the season, player stats are keyed by ``player_id``"""
+
+    game_id: str
+    digest: Optional[str] = None
+    players: Dict[int, Dict[str, int]] = field(default_factory=dict)
+    teams: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    player_info: Dict[int, Dict[str, str]] = field(default_factory=dict)
+
+
+def game_stats(game_id, parsed_event: munging.ParsedEvent, digest=None) -> GameStats:
+    """Box score of a parsed game
+
+    Team and player counts both come from the play by play, the lines and the
+    block events, so a team's completions, throwaways, drops, blocks and goals
+    are its players' added up (plus any throws or blocks with nobody on the
+    roster to credit). A team's possessions are how many it had, a player's
+    how many they were on the line for. These aren't the per point
+    ``home_stats``/``away_stats``, which count raw events: a throwaway event
+    after a drop is another throwaway there, and possessions are counted
+    differently.
+    """
+    away_team, home_team = common.teams_of_game(game_id)
+    team_names = {"home": home_team, "away": away_team}
+    players: Dict[int, Counter] = {}
+    player_info: Dict[int, Dict[str, str]] = {}
+    teams = {home_team: Counter(games=1), away_team: Counter(games=1)}
+
+    def player_stats(player) -> Counter:
+        stats = players.get(player.player_id)
+        if stats is None:
+            stats = players[player.player_id] = Counter(games=1)
+        return stats
+
+    for point in parsed_event.points:
+        for side, line, events in [
+            ("home", point.home_players, point.home_point_event),
+            ("away", point.away_players, point.away_point_event),
+        ]:
+            team = teams[team_names[side]]
+            team["points_played"] += 1
+
+            for player in line:
+                if player is not None:
+                    player_stats(player)["points_played"] += 1
+                    player_info[player.player_id] = {
+                        "name": player.name,
+                        "short_name": player.short_name,
+                        "team": team_names[side],
+                    }
+
+            # the blocker is only on the defending team's block event
+            for event in events:
+                if event["t"] == 5:
+                    team["blocks"] += 1
+                    player = parsed_event.roster_id_map.get(event.get("r"))
+                    if player is not None:
+                        player_stats(player)["blocks"] += 1
+
+    for possession in parsed_event.possessions:
+        team = teams[team_names[possession.team]]
+        team["possessions"] += 1
+        if possession.goal:
+            team["goals"] += 1
+
+        for player in possession.starting_line:
+            if player is not None:
+                player_stats(player)["possessions"] += 1
+
+        for throw in possession.play_by_play:
+            if not throw.turnover:
+                team["completions"] += 1
+            if throw.throwaway:
+                team["throwaways"] += 1
+            if throw.drop:
+                team["drops"] += 1
+
+            if throw.thrower is None:
+                continue
+
+            thrower = player_stats(throw.thrower)
+            if not throw.turnover:
+                thrower["completions"] += 1
+            if throw.throwaway:
+                thrower["throwaways"] += 1
+            if throw.goal:
+                thrower["assists"] += 1
+                if throw.receiver is not None:
+                    player_stats(throw.receiver)["goals"] += 1
+            if throw.drop and throw.receiver is not None:
+                player_stats(throw.receiver)["drops"] += 1
+
+    return GameStats(
+        game_id,
+        digest,
+        {k: dict(v) for k, v in players.items()},
+        {k: dict(v) for k, v in teams.items()},
+        player_info,
+    )
+
+
+def _add(totals, contribution, sign):
+    for key, stats in contribution.items():
+        total = totals.setdefault(key, Counter())
+        for name, value in stats.items():
+            total[name] += sign * value
+        # nothing left once the last game someone played in is taken out
+        if total["games"] <= 0:
+            del totals[key]
+
+
+class SeasonStats(object):
+    """Running player and team totals over the games added so far, persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(common.cache_dir(), "season_stats.json")
+        self.games: Dict[str, GameStats] = {}
+        self.players: Dict[int, Counter] = {}
+        self.teams: Dict[str, Counter] = {}
+        self.player_info: Dict[int, Dict[str, str]] = {}
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SeasonStats":
+        season = cls(path)
+        try:
+            with open(season.path, "rb") as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return season
+        except ValueError:
+            logger.warning("Discarding corrupt season stats at %s", season.path)
+            return season
+
+        if data.get("version") != SEASON_STATS_VERSION:
+            return season
+
+        for x in data["games"]:
+            # JSON object keys are strings
+            x["players"] = {int(k): v for k, v in x["players"].items()}
+            x["player_info"] = {int(k): v for k, v in x["player_info"].items()}
+            season.add(GameStats(**x))
+        return season
+
+    def save(self):
+        data = {
+            "version": SEASON_STATS_VERSION,
+            "games": [asdict(self.games[k]) for k in sorted(self.games)],
+        }
+        common.atomic_write(self.path, json.dumps(data).encode("utf-8"))
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def add(self, stats: GameStats):
+        """Count a game towards the totals, replacing it if it was already counted"""
+        self.remove(stats.game_id)
+
+        self.games[stats.game_id] = stats
+        _add(self.players, stats.players, 1)
+        _add(self.teams, stats.teams, 1)
+        self.player_info.update(stats.player_info)
+
+    def add_game(self, game_id, parsed_event: munging.ParsedEvent, digest=None):
+        self.add(game_stats(game_id, parsed_event, digest))
+
+    def remove(self, game_id):
+        stats = self.games.pop(game_id, None)
+        if stats is None:
+            return
+
+        _add(self.players, stats.players, -1)
+        _add(self.teams, stats.teams, -1)
+        for player_id in stats.players:
+            if player_id not in self.players:
+                self.player_info.pop(player_id, None)
+
+    def update_from_archive(self, archive_path, registry=None) -> List[str]:
+        """Add the games of an ingest archive that are new or changed, returning their ids"""
+        registry = registry if registry is not None else munging.PlayerRegistry()
+        changed = []
+        digests = {k: v.digest for k, v in self.games.items()}
+        for game_id, digest, game_info in ingest.iter_changed_games(archive_path, digests):
+            try:
+                parsed = munging.ParsedEvent(*munging.parse_events(game_info, registry=registry))
+            except Exception as e:
+                logger.warning("Leaving %s out of the season stats: %r", game_id, e)
+                continue
+
+            self.add_game(game_id, parsed, digest)
+            changed.append(game_id)
+
+        return changed
+
+    def player(self, player_id) -> Dict[str, int]:
+        stats = self.players.get(player_id, Counter())
+        return {name: stats[name] for name in PLAYER_STATS}
+
+    def team(self, team) -> Dict[str, int]:
+        stats = self.teams.get(team, Counter())
+        return {name: stats[name] for name in TEAM_STATS}
+
+    def leaderboard(self, stat, n=10, teams=False) -> List[Tuple]:
+        """Top ``n`` players (or teams) by ``stat`` as ``(player_id or team, value)``"""
+        totals = self.teams if teams else self.players
+        return heapq.nlargest(n, ((k, v[stat]) for k, v in totals.items()), key=lambda x: x[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Season totals of the games in an ingest archive")
+    parser.add_argument("archive", help="archive written by audldb.ingest")
+    parser.add_argument("--stats", help="season stats file, defaults to one in the cache directory")
+    parser.add_argument("--leaderboard", default="goals", choices=PLAYER_STATS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    season = SeasonStats.load(args.stats)
+    changed = season.update_from_archive(args.archive)
+    if changed:
+        season.save()
+    logger.info("Counted %d new or changed games, %d in total", len(changed), len(season.games))
+
+    for player_id, value in season.leaderboard(args.leaderboard, args.top):
+        info = season.player_info[player_id]
+        print(f"{value:5d}  {info['name']} ({info['team']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Deterministic, made up games in the shape of the stats API payloads.
+
+The same seed always gives the same game, so these can stand in for real games
+in benchmarks and when checking that two versions of the parser agree.
+
+    python -m audldb.synthetic games.jsonl.gz --games 100
+"""
+
+import argparse
+import datetime
+import json
+import random
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import ingest
+
+TEAMS = ["ATL", "AUS", "BOS", "CHI", "DAL", "DC", "LA", "MIN", "NY", "SEA", "SJ", "TOR"]
+
+LINE_SIZE = 7
+FIELD_WIDTH = 53.33
+FIELD_LENGTH = 120.0
+END_ZONE = 20.0
+
+
+def make_roster(team, roster_size=24) -> List[Dict]:
+    """A team's roster, the same in every game so players line up across a season"""
+    rnd = random.Random(team)
+    team_season_id = TEAMS.index(team) + 1
+    first_id = team_season_id * 1000
+    return [
+        {
+            "id": first_id + i,
+            "team_season_id": team_season_id,
+            "player_id": first_id + 500 + i,
+            "jersey_number": i,
+            "player": {
+                "first_name": f"{team}{i}",
+                "last_name": rnd.choice(["Smith", "Jones", "Lee", "Garcia", "Brown"]),
+                "ext_player_id": f"{team.lower()}player{i}",
+            },
+        }
+        for i in range(roster_size)
+    ]
+
+
+class _GameWriter(object):
+    """Appends matching events to both teams' streams, point by point
+
+    Coordinates are from the point of view of the team with the disc, which
+    attacks towards y = ``FIELD_LENGTH``.
+    """
+
+    def __init__(self, rnd, home_roster, away_roster, odd_sequences):
+        self.rnd = rnd
+        self.events = {"home": [], "away": []}
+        self.rosters = {"home": home_roster, "away": away_roster}
+        self.odd_sequences = odd_sequences
+
+    def x(self):
+        return round(self.rnd.uniform(-FIELD_WIDTH / 2, FIELD_WIDTH / 2), 2)
+
+    def point(self, pulling, end_of_quarter=False) -> str:
+        """Play one point, returns the team that scored or ``None``"""
+        rnd = self.rnd
+        receiving = "away" if pulling == "home" else "home"
+        lines = {
+            team: [x["id"] for x in rnd.sample(self.rosters[team], LINE_SIZE)]
+            for team in ["home", "away"]
+        }
+        self.events[receiving].append({"t": 1, "l": lines[receiving], "ms": 0})
+        self.events[pulling].append({"t": 2, "l": lines[pulling], "ms": 0})
+
+        # an offsides pull means the receiving team starts at the brick without one
+        if not (self.odd_sequences and rnd.random() < 0.02):
+            pull = {"t": 3, "x": self.x(), "y": round(rnd.uniform(80, 110), 2)}
+            pull["ms"] = rnd.randint(3000, 7500)
+            # the puller isn't always recorded
+            if not (self.odd_sequences and rnd.random() < 0.05):
+                pull["r"] = rnd.choice(lines[pulling])
+            self.events[pulling].append(pull)
+
+        offense, defense = receiving, pulling
+        y = rnd.uniform(END_ZONE, 45)
+        num_possessions = 0
+        while True:
+            num_possessions += 1
+            if end_of_quarter and num_possessions > 1 and rnd.random() < 0.3:
+                # the clock runs out at a change of possession
+                self.events[offense].append({"t": 25})
+                self.events[defense].append({"t": 26})
+                return None
+
+            outcome, y = self.possession(offense, defense, lines, y)
+            if outcome == "goal":
+                return offense
+
+            # the other team picks up where the disc ended up, attacking the other way
+            offense, defense = defense, offense
+            y = max(END_ZONE, FIELD_LENGTH - y)
+
+    def possession(self, offense, defense, lines, y) -> Tuple[str, float]:
+        rnd = self.rnd
+        o_events, d_events = self.events[offense], self.events[defense]
+        o_line, d_line = lines[offense], lines[defense]
+
+        thrower = rnd.choice(o_line)
+        while True:
+            o_events.append({"t": 20, "r": thrower, "x": self.x(), "y": round(y, 2)})
+            y_to = min(FIELD_LENGTH - END_ZONE - 1, y + rnd.uniform(-5, 25))
+            receiver = rnd.choice([x for x in o_line if x != thrower])
+
+            u = rnd.random()
+            if u < 0.08:
+                o_events.append({"t": 22, "r": receiver, "x": self.x(), "y": round(rnd.uniform(100, 118), 2)})
+                d_events.append({"t": 21})
+                return "goal", y
+            elif u < 0.11:
+                o_events.append({"t": 8, "x": self.x(), "y": round(y_to + 10, 2)})
+                d_events.append({"t": 9})
+                return "throwaway", y_to + 10
+            elif u < 0.13:
+                o_events.append({"t": 8, "x": self.x(), "y": round(y_to, 2)})
+                d_events.append({"t": 5, "r": rnd.choice(d_line)})
+                return "block", y_to
+            elif u < 0.145:
+                o_events.append({"t": 19, "r": receiver, "x": self.x(), "y": round(y_to, 2)})
+                # as in 2021-07-02-SEA-AUS, a drop that's also logged as a throwaway
+                if self.odd_sequences and rnd.random() < 0.1:
+                    o_events.append({"t": 8, "x": self.x(), "y": round(y_to, 2)})
+                d_events.append({"t": 9})
+                return "drop", y_to
+            elif u < 0.15:
+                o_events.append({"t": 17})
+                d_events.append({"t": 18})
+                return "stall", y
+            else:
+                thrower, y = receiver, max(0.0, y_to)
+
+
+def generate_game(
+    seed: int = 0,
+    num_points: int = 40,
+    home_team: Optional[str] = None,
+    away_team: Optional[str] = None,
+    date: Optional[datetime.date] = None,
+    roster_size: int = 24,
+    odd_sequences: bool = True,
+) -> Dict:
+    """A game with ``num_points`` points, in the shape of a stats API game
+
+    It has pulls, completions, throwaways, blocks, drops, stalls, goals and
+    an end of quarter every quarter of the way through. With
+    ``odd_sequences`` it also has the quirks seen in real games: offsides
+    points with no pull, pulls without a puller and drops followed by a
+    throwaway.
+    """
+    rnd = random.Random(seed)
+    if home_team is None or away_team is None:
+        home_team, away_team = rnd.sample(TEAMS, 2)
+    if date is None:
+        date = datetime.date(2021, 6, 1) + datetime.timedelta(days=seed % 90)
+
+    game_id = f"{date.isoformat()}-{away_team}-{home_team}"
+    home_roster = make_roster(home_team, roster_size)
+    away_roster = make_roster(away_team, roster_size)
+
+    writer = _GameWriter(rnd, home_roster, away_roster, odd_sequences)
+    score = {"home": 0, "away": 0}
+    quarter_ends = {num_points * (i + 1) // 4 - 1 for i in range(3)}
+    pulling = rnd.choice(["home", "away"])
+    for point_index in range(num_points):
+        scored = writer.point(pulling, point_index in quarter_ends)
+        if scored is None:
+            # the next quarter's pull goes to whoever didn't start the last one
+            pulling = "away" if pulling == "home" else "home"
+        else:
+            score[scored] += 1
+            pulling = scored
+
+    return {
+        "game": {
+            "ext_game_id": game_id,
+            "status": "Final",
+            "score_home": score["home"],
+            "score_away": score["away"],
+        },
+        "rostersHome": home_roster,
+        "rostersAway": away_roster,
+        "tsgHome": {"events": json.dumps(writer.events["home"])},
+        "tsgAway": {"events": json.dumps(writer.events["away"])},
+    }
+
+
+def game_id_of(game_info) -> str:
+    return game_info["game"]["ext_game_id"]
+
+
+def generate_season(num_games: int, seed: int = 0, num_points: int = 40, **kwargs) -> Iterator[Tuple[str, Dict]]:
+    """``(game_id, game_info)`` pairs of ``num_games`` games, see ``generate_game``"""
+    rnd = random.Random(seed)
+    games_per_day = len(TEAMS) // 2
+    for i in range(num_games):
+        # every team plays once a day, so game ids never repeat
+        if i % games_per_day == 0:
+            teams = rnd.sample(TEAMS, len(TEAMS))
+        home_team, away_team = teams[2 * (i % games_per_day): 2 * (i % games_per_day) + 2]
+        date = datetime.date(2021, 4, 1) + datetime.timedelta(days=i // games_per_day)
+        game_info = generate_game(
+            rnd.getrandbits(32),
+            num_points,
+            home_team,
+            away_team,
+            date,
+            **kwargs,
+        )
+        yield game_id_of(game_info), game_info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic games to an ingest archive")
+    parser.add_argument("archive", help="archive to append to, see audldb.ingest")
+    parser.add_argument("--games", type=int, default=30)
+    parser.add_argument("--points", type=int, default=40, help="points per game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with ingest.ArchiveWriter(args.archive) as writer:
+        for game_id, game_info in generate_season(args.games, args.seed, args.points):
+            writer.append(game_id, game_info)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Latency histograms for the stages of loading a game.
+
+Tracing is off unless ``AUDLDB_TRACE`` is set (or ``enable()`` is called), and
+while it's off every ``stage``/``span``/``traced`` call is a flag check and
+nothing more. When it's on, every timed stage goes into a ``StageHistogram``,
+read back with ``snapshot()`` or logged with ``log_summary()``.
+
+    with tracing.stage("decode_payload"):
+        game_info = json.loads(content)
+"""
+
+import logging
+import math
+import os
+import threading
+
+from functools import wraps
+from time import perf_counter
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# bucket i holds durations up to 2**i microseconds, the last one everything longer (~35 minutes)
+NUM_BUCKETS = 32
+
+_enabled = os.environ.get("AUDLDB_TRACE", "").lower() not in ("", "0", "false", "no")
+_lock = threading.Lock()
+_histograms: Dict[str, "StageHistogram"] = {}
+
+
+class StageHistogram(object):
+    """Durations of one stage in power of two microsecond buckets"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: List[int] = [0] * NUM_BUCKETS
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        # frexp's exponent is ceil(log2) for anything that isn't a power of two
+        _, exponent = math.frexp(seconds * 1e6)
+        self.buckets[min(max(exponent, 0), NUM_BUCKETS - 1)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q) -> float:
+        """Upper bound of the bucket the ``q``th percentile falls in, in seconds"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(2.0 ** i / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": list(self.buckets),
+        }
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def disable():
+    enable(False)
+
+
+def record(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = StageHistogram(name)
+        histogram.record(seconds)
+
+
+class _Stage(object):
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, perf_counter() - self.start)
+        return False
+
+
+class Span(object):
+    """Time of a stage summed over several ``with`` blocks, recorded once with ``record()``
+
+    For stages that are done a piece at a time, like the play by play of
+    each point of a game, where the total is what's worth a histogram.
+    """
+
+    __slots__ = ("name", "elapsed", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed += perf_counter() - self.start
+        return False
+
+    def record(self):
+        record(self.name, self.elapsed)
+
+
+class _Disabled(object):
+    """Shared stand in for ``_Stage`` and ``Span`` while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def record(self):
+        pass
+
+
+_DISABLED = _Disabled()
+
+
+def stage(name):
+    """Context manager recording how long its block took under ``name``"""
+    return _Stage(name) if _enabled else _DISABLED
+
+
+def span(name):
+    return Span(name) if _enabled else _DISABLED
+
+
+def traced(name):
+    """Decorator recording every call of the function under ``name``"""
+
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return f(*args, **kwargs)
+
+            start_time = perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start_time)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Every stage's histogram so far, see ``StageHistogram.to_dict``"""
+    with _lock:
+        return {name: histogram.to_dict() for name, histogram in _histograms.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def log_summary(level=logging.INFO):
+    for name, stats in sorted(snapshot().items()):
+        logger.log(
+            level,
+            "%s: %d calls, mean %.2fms, p50 %.2fms, p95 %.2fms, p99 %.2fms, max %.2fms",
+            name,
+            stats["count"],
+            stats["mean"] * 1e3,
+            stats["p50"] * 1e3,
+            stats["p95"] * 1e3,
+            stats["p99"] * 1e3,
+            stats["max"] * 1e3,
+        )
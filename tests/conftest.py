@@ -0,0 +1,36 @@
+import pytest
+
+from audldb import munging, synthetic
+
+
+@pytest.fixture(scope="session")
+def season():
+    """``(game_id, game_info)`` of synthetic games, with every odd sequence the generator makes"""
+    return list(synthetic.generate_season(12, seed=1, num_points=30))
+
+
+@pytest.fixture(scope="session")
+def parsed_season(season):
+    return [(game_id, game_info, munging.parse_events(game_info)) for game_id, game_info in season]
+
+
+def point_fields(point):
+    """What two parses of the same point have to agree on, ``Point`` has no ``__eq__``"""
+    return (
+        point.home_point_event,
+        point.away_point_event,
+        point.pulling_team,
+        point.receiving_team,
+        point.scoring_team,
+        point.home_players,
+        point.away_players,
+        point.home_stats,
+        point.away_stats,
+        point.play_by_play,
+    )
+
+
+def parse_fields(parsed):
+    """Comparable form of ``parse_events``' ``(roster_id_map, points, possessions)``"""
+    roster_id_map, points, possessions = parsed
+    return roster_id_map, [point_fields(x) for x in points], list(possessions)
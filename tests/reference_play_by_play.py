@@ -0,0 +1,329 @@
+"""
+The play by play as it was worked out before the table driven
+``munging.create_point_play_by_play``, one step of the o and d streams at a
+time. Only kept to check the table driven one against.
+"""
+
+from typing import Dict, Tuple, Union
+
+from audldb.munging import (
+    PlayByPlayError,
+    Pull,
+    Throw,
+    change_possession,
+    get_player_from_id,
+    get_pulling_team,
+)
+
+
+def return_indices(
+    action,
+    new_o_index,
+    new_d_index,
+    previous_possession,
+    new_possession,
+    point_over=False,
+):
+    if previous_possession == "o":
+        return_value = action, new_o_index, new_d_index, new_possession, point_over
+    elif previous_possession == "d":
+        return_value = action, new_d_index, new_o_index, new_possession, point_over
+    else:
+        raise ValueError("previous_possession must be one of ['o', 'd']")
+    
+    return return_value
+
+
+def handle_next_step(
+    roster_id_map,
+    starting_o_event,
+    starting_d_event,
+    o_index,
+    d_index,
+    possession,
+) -> Tuple[Union[None, Pull, Throw], int, int, str, bool]:
+
+    if o_index > (len(starting_o_event) - 1) or d_index > (len(starting_d_event) - 1):
+        action = None
+        return return_indices(action, o_index, d_index, possession, possession, True)
+
+    if starting_o_event[o_index]["t"] in [23, 24] or starting_d_event[d_index]["t"] in [
+        23,
+        24,
+    ]:
+        return return_indices(None, o_index, d_index, possession, possession, True)
+
+    #     print(f"{o_index}, {d_index}, {starting_o_event[o_index]}, {starting_d_event[d_index]}")
+
+    # assign a default so that the linter stops yelling about current_d_event being unbounded
+    current_o_event: Dict = {}
+    current_o_index: int = 0
+    next_o_event: Dict = {}
+
+    current_d_event: Dict = {}
+    current_d_index: int = 0
+
+    if possession == "o":
+        current_o_event = starting_o_event[o_index]
+        current_o_index = int(o_index)
+        current_d_event = starting_d_event[d_index]
+        current_d_index = int(d_index)
+
+        # end of quarter?
+        if current_o_event["t"] in [25, 26] or current_d_event["t"] in [25, 26]:
+            action = None
+            return return_indices(
+                action, current_o_index, current_d_index, possession, possession, True
+            )
+
+        next_o_event = starting_o_event[o_index + 1]
+
+    elif possession == "d":
+        current_o_event = starting_d_event[d_index]
+        current_o_index = int(d_index)
+        current_d_event: Dict = starting_o_event[o_index]
+        current_d_index = int(o_index)
+
+        # end of quarter?
+        if current_o_event["t"] in [25, 26] or current_d_event["t"] in [25, 26]:
+            action = None
+            return return_indices(
+                action, current_o_index, current_d_index, possession, possession, True
+            )
+
+        next_o_event = starting_d_event[current_o_index + 1]
+
+    else:
+        raise ValueError("possession must be one of ['o', 'd']")
+
+    if current_d_event["t"] == 3:
+        player_id = current_d_event["r"] if "r" in current_d_event else None
+        puller = get_player_from_id(roster_id_map, player_id)
+        action = Pull(
+            puller, current_d_event["x"], current_d_event["y"], current_d_event["ms"]
+        )
+
+        current_d_index += 1
+        return return_indices(
+            action, current_o_index, current_d_index, possession, possession
+        )
+
+    elif current_o_event["t"] == 20:
+        # check if there was a throwaway
+        if next_o_event["t"] == 8:
+            # check if it was a block
+            if current_d_event["t"] == 5:
+                action = Throw(
+                    get_player_from_id(roster_id_map, current_o_event["r"]),
+                    None,
+                    current_o_event["x"],
+                    current_o_event["y"],
+                    None,
+                    None,
+                    True,
+                    True,
+                    True,
+                    False,
+                    False,
+                    False,
+                )
+
+                current_o_index += 2
+                current_d_index += 1
+                return return_indices(
+                    action,
+                    current_o_index,
+                    current_d_index,
+                    possession,
+                    change_possession(possession),
+                )
+                
+            # it was a throwaway
+            else:
+                action = Throw(
+                    get_player_from_id(roster_id_map, current_o_event["r"]),
+                    None,
+                    current_o_event["x"],
+                    current_o_event["y"],
+                    next_o_event["x"],  # they log the x and y of the throwaway
+                    next_o_event["y"],
+                    True,
+                    True,
+                    False,
+                    False,
+                    False,
+                    False,
+                )
+
+                current_o_index += 2
+                current_d_index += 1
+                return return_indices(
+                    action,
+                    current_o_index,
+                    current_d_index,
+                    possession,
+                    change_possession(possession),
+                )
+            
+        # check if it was a stall
+        elif next_o_event["t"] == 17:
+            action = Throw(
+                get_player_from_id(roster_id_map, current_o_event["r"]),
+                None,
+                current_o_event["x"],
+                current_o_event["y"],
+                None,
+                None,
+                True,
+                False,
+                False,
+                False,
+                False,
+                True,
+            )
+
+            current_o_index += 2
+            current_d_index += 1
+            return return_indices(
+                action,
+                current_o_index,
+                current_d_index,
+                possession,
+                change_possession(possession),
+            )
+
+        # check if it was a drop
+        elif next_o_event["t"] == 19:
+            action = Throw(
+                get_player_from_id(roster_id_map, current_o_event["r"]),
+                get_player_from_id(roster_id_map, next_o_event["r"]),
+                current_o_event["x"],
+                current_o_event["y"],
+                next_o_event["x"],
+                next_o_event["y"],
+                True,
+                False,
+                False,
+                True,
+                False,
+                False,
+            )
+
+            # there was a case in game 2021-07-02-SEA-AUS where an 8 event followed a 19 event, 
+            # which can't happen. A throw cannot be both a drop and a throwaway. So we check for this, 
+            # and decide to skip that following 8 event.
+            whole_o_event = starting_o_event if possession == "o" else starting_d_event
+            if whole_o_event[current_o_index + 2]["t"] == 8:
+                current_o_index += 3
+            else:
+                current_o_index += 2
+            
+            current_d_index += 1
+            return return_indices(
+                action,
+                current_o_index,
+                current_d_index,
+                possession,
+                change_possession(possession),
+            )
+
+        # check if it was a goal
+        elif next_o_event["t"] == 22:
+            action = Throw(
+                get_player_from_id(roster_id_map, current_o_event["r"]),
+                get_player_from_id(roster_id_map, next_o_event["r"]),
+                current_o_event["x"],
+                current_o_event["y"],
+                next_o_event["x"],
+                next_o_event["y"],
+                False,
+                False,
+                False,
+                False,
+                True,
+                False,
+            )
+
+            # don't worry about changing indices since the point is over
+            return return_indices(
+                action, current_o_index, current_d_index, possession, possession, True
+            )
+
+        else:
+            action = Throw(
+                get_player_from_id(roster_id_map, current_o_event["r"]),
+                get_player_from_id(roster_id_map, next_o_event["r"]),
+                current_o_event["x"],
+                current_o_event["y"],
+                next_o_event["x"],
+                next_o_event["y"],
+                False,
+                False,
+                False,
+                False,
+                False,
+                False,
+            )
+
+            current_o_index += 1
+
+            return return_indices(
+                action, current_o_index, current_d_index, possession, possession
+            )
+
+    else:
+        raise ValueError(
+            f"Unbound event within possession: possession: {possession}, o_index: {o_index}, d_index: {d_index}, current_o_event: {current_o_event}, current_d_event: {current_d_event}, starting_o_event: {starting_o_event}, starting_d_event: {starting_d_event}")
+
+
+def create_point_play_by_play(point, roster_id_map, point_index=None):
+    """Reference for ``munging.create_point_play_by_play``"""
+    numbers_care_about = [3, 5, 8, 9, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26]
+
+    point_actions = []
+    new_o_index = 0
+    new_d_index = 0
+    possession = "o"
+    point_over = False
+
+    pulling_team = get_pulling_team(point.home_point_event, point.away_point_event)
+    starting_o_event = (
+        point.away_point_event if pulling_team == "home" else point.home_point_event
+    )
+    starting_d_event = (
+        point.home_point_event if pulling_team == "home" else point.away_point_event
+    )
+
+    starting_o_event = [
+        x for x in starting_o_event[1:] if x["t"] in numbers_care_about
+    ]
+    starting_d_event = [
+        x for x in starting_d_event[1:] if x["t"] in numbers_care_about
+    ]
+
+    while not point_over:
+        try:
+            action, new_o_index, new_d_index, possession, point_over = handle_next_step(
+                roster_id_map,
+                starting_o_event,
+                starting_d_event,
+                new_o_index,
+                new_d_index,
+                possession,
+            )
+
+        except Exception as e:
+            raise PlayByPlayError(
+                point_index,
+                point,
+                starting_o_event,
+                starting_d_event,
+                new_o_index,
+                new_d_index,
+                possession,
+            ) from e
+
+        if action is not None:
+            point_actions.append(action)
+
+    return point_actions
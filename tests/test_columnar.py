@@ -0,0 +1,42 @@
+import json
+
+from audldb import columnar, munging
+
+from conftest import parse_fields
+
+
+def get_num_stats(point):
+    return {
+        "throwaways": munging.get_num_throwaways(point),
+        "drops": munging.get_num_drops(point),
+        "blocks": munging.get_num_blocks(point),
+        "completions": munging.get_num_completions(point),
+        "possessions": munging.get_num_possessions(point),
+    }
+
+
+def team_events(season):
+    for _, game_info in season:
+        for team in ["tsgHome", "tsgAway"]:
+            yield json.loads(game_info[team]["events"])
+
+
+def test_point_stats_match_get_num(season):
+    for events in team_events(season):
+        for point in munging.filter_empty_points(munging.events_per_point(events)):
+            assert munging.PointStats.from_events(point) == get_num_stats(point)
+
+
+def test_columnar_points_match(season):
+    for events in team_events(season):
+        columns = columnar.decode_events(events)
+        points = munging.filter_empty_points(munging.events_per_point(events))
+        assert columns.point_events() == points
+        assert columns.point_stats() == [get_num_stats(x) for x in points]
+
+
+def test_columnar_parse_matches(season):
+    for _, game_info in season:
+        assert parse_fields(munging.parse_events(game_info, use_columnar=True)) == parse_fields(
+            munging.parse_events(game_info)
+        )
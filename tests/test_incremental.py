@@ -0,0 +1,74 @@
+import json
+import random
+
+from audldb import munging, synthetic
+
+from conftest import parse_fields
+
+
+def with_events(game_info, home_events, away_events, separator=", "):
+    game_info = dict(game_info)
+    game_info["tsgHome"] = {"events": "[" + separator.join(json.dumps(x) for x in home_events) + "]"}
+    game_info["tsgAway"] = {"events": "[" + separator.join(json.dumps(x) for x in away_events) + "]"}
+    return game_info
+
+
+def incremental_fields(live):
+    return parse_fields((live.roster_id_map, live.points, live.possessions))
+
+
+def test_growing_payload_matches_parse_events():
+    rnd = random.Random(0)
+    num_matched = 0
+    for seed in range(20):
+        game_info = synthetic.generate_game(seed, 12)
+        home = json.loads(game_info["tsgHome"]["events"])
+        away = json.loads(game_info["tsgAway"]["events"])
+
+        live = munging.IncrementalParse()
+        num_home = num_away = 0
+        while num_home < len(home) or num_away < len(away):
+            num_home = min(len(home), num_home + rnd.randint(0, 15))
+            num_away = min(len(away), num_away + rnd.randint(0, 15))
+            prefix = with_events(game_info, home[:num_home], away[:num_away], rnd.choice([",", ", "]))
+            live.update(prefix)
+
+            # a payload cut part way through its last point can't always be parsed in full,
+            # the incremental parse leaves that point out until it can
+            try:
+                expected = parse_fields(munging.parse_events(prefix))
+            except munging.PlayByPlayError:
+                continue
+            assert incremental_fields(live) == expected
+            num_matched += 1
+
+        assert incremental_fields(live) == parse_fields(munging.parse_events(game_info))
+
+    assert num_matched > 50
+
+
+def test_corrected_earlier_event_reparses():
+    game_info = synthetic.generate_game(7, 20)
+    home = json.loads(game_info["tsgHome"]["events"])
+    away = json.loads(game_info["tsgAway"]["events"])
+
+    live = munging.IncrementalParse()
+    live.update(with_events(game_info, home[:-30], away[:-30]))
+
+    # a stat correction to an early throw arrives along with the rest of the game
+    corrected = [dict(x) for x in home]
+    throw = next(x for x in corrected[5:] if "x" in x)
+    throw["x"] += 1.0
+    final = with_events(game_info, corrected, away)
+    live.update(final)
+
+    assert incremental_fields(live) == parse_fields(munging.parse_events(final))
+
+
+def test_different_game_reparses():
+    live = munging.IncrementalParse()
+    live.update(synthetic.generate_game(1, 12))
+
+    other = synthetic.generate_game(2, 12)
+    live.update(other)
+    assert incremental_fields(live) == parse_fields(munging.parse_events(other))
@@ -0,0 +1,52 @@
+import reference_play_by_play
+
+from audldb import munging
+
+
+def test_table_driven_matches_reference(parsed_season):
+    num_points = 0
+    for _, _, (roster_id_map, points, _) in parsed_season:
+        for point_index, point in enumerate(points):
+            expected = reference_play_by_play.create_point_play_by_play(point, roster_id_map, point_index)
+            assert munging.create_point_play_by_play(point, roster_id_map, point_index) == expected
+            num_points += 1
+
+    assert num_points > 300
+
+
+def test_play_by_play_covers_every_ending(parsed_season):
+    # the comparison above only means something if the games go through every transition
+    throws = [
+        throw
+        for _, _, (_, _, possessions) in parsed_season
+        for possession in possessions
+        for throw in possession.play_by_play
+    ]
+    for flag in ["goal", "throwaway", "block", "drop", "stall"]:
+        assert any(getattr(x, flag) for x in throws), flag
+
+
+def outcome(create, point, roster_id_map, point_index):
+    try:
+        return create(point, roster_id_map, point_index)
+    except munging.PlayByPlayError:
+        return munging.PlayByPlayError
+
+
+def test_cut_off_points_agree(parsed_season):
+    # points that stop part way through (like the last one of a game in progress)
+    # have to give the same play by play, or fail the same way
+    num_failed = 0
+    for _, _, (roster_id_map, points, _) in parsed_season[:2]:
+        for point_index, point in enumerate(points[:10]):
+            for cut in range(1, max(len(point.home_point_event), len(point.away_point_event))):
+                cut_point = munging.Point(
+                    point.home_point_event[:cut],
+                    point.away_point_event[:cut],
+                    roster_id_map,
+                )
+                expected = outcome(reference_play_by_play.create_point_play_by_play, cut_point, roster_id_map, point_index)
+                assert outcome(munging.create_point_play_by_play, cut_point, roster_id_map, point_index) == expected
+                num_failed += expected is munging.PlayByPlayError
+
+    assert num_failed > 0
@@ -0,0 +1,36 @@
+from audldb import munging, query
+
+
+def query_results(index):
+    """What a few queries found, by identity so that it's the same objects that come back"""
+    player_ids = sorted({x.thrower.player_id for x in index.throws if x is not None and x.thrower})
+    return {
+        player_id: (
+            sorted(map(id, index.turnovers(player_id))),
+            sorted(map(id, index.find_throws(thrower=player_id, zone="attacking"))),
+            sorted((game_id, id(x)) for game_id, x in index.find_possessions(player=player_id)),
+        )
+        for player_id in player_ids[:20]
+    }
+
+
+def test_removed_games_slots_are_reused(parsed_season):
+    games = [(game_id, munging.ParsedEvent(*parsed)) for game_id, _, parsed in parsed_season]
+    index = query.build_index(games)
+    num_throws, num_possessions = len(index.throws), len(index.possessions)
+
+    # like live games being reparsed over and over
+    for _ in range(3):
+        for game_id, parsed in games[::2]:
+            index.add_game(game_id, parsed)
+    index.remove_game(games[1][0])
+    index.add_game(*games[1])
+
+    assert len(index.throws) == num_throws
+    assert len(index.possessions) == num_possessions
+    assert None not in index.throws
+    assert query_results(index) == query_results(query.build_index(games))
+
+    for throw_number, throw in enumerate(index.throws):
+        _, possession = index.possession_of(throw_number)
+        assert any(x is throw for x in possession.play_by_play)